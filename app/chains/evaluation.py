@@ -0,0 +1,150 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from langchain_core.runnables import Runnable
+
+from app.chains.registry import prompt_version
+from app.chains.summary import evaluation_history
+from app.memory.rolling_summary import RollingSummaryMemory
+from app.utils.jobs import Job, evaluation_queue, wait_for_job
+from app.utils.llm_gateway import llm_lane
+from app.utils.shared_db import SHARED, connect
+from app.config.settings import DEBUG, GEMINI_MODEL, EVALUATION_CACHE_SIZE, JOB_STALE_SECONDS
+
+# Shared by all four interview modes. Evaluations run on the evaluation job
+# queue; the request only gets a job ID to poll (`/jobs/{job_id}`) or follow
+# (`/jobs/{job_id}/events`). Finished feedback is cached by everything it
+# depends on, so re-evaluating an unchanged session returns at once. With
+# the shared SQLite store the cache, like the jobs, is seen by every worker.
+
+class _LocalResults:
+    def __init__(self, size: int):
+        self.size = size
+        self._results: OrderedDict[str, dict] = OrderedDict()
+
+    def get(self, key: str) -> dict | None:
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+        return result
+
+    def put(self, key: str, result: dict):
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.size:
+            self._results.popitem(last=False)
+
+class _SharedResults:
+    """The same LRU cache as a table in the shared SQLite file."""
+    def __init__(self, size: int):
+        self.size = size
+        self._lock = threading.Lock()
+        self._db = connect()
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS evaluations (key TEXT PRIMARY KEY, result TEXT NOT NULL, used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS evaluations_used ON evaluations(used)")
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            row = self._db.execute("SELECT result FROM evaluations WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._db.execute("UPDATE evaluations SET used = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, result: dict):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO evaluations (key, result, used) VALUES (?, ?, ?)",
+                (key, json.dumps(result, ensure_ascii=False), time.time())
+            )
+            self._db.execute(
+                "DELETE FROM evaluations WHERE key NOT IN (SELECT key FROM evaluations ORDER BY used DESC LIMIT ?)",
+                (self.size,)
+            )
+
+_results = _SharedResults(EVALUATION_CACHE_SIZE) if SHARED else _LocalResults(EVALUATION_CACHE_SIZE)
+
+def evaluation_key(mode: str, prompt_path: Path, inputs: dict, transcript: str) -> str:
+    """Hash of (mode, model, prompt version, resume/JD/role, transcript)."""
+    material = json.dumps(
+        [mode, GEMINI_MODEL, prompt_version(prompt_path), inputs, transcript],
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+def submit_evaluation(
+    mode: str,
+    prompt_path: Path,
+    chain: Runnable,
+    inputs: dict,
+    session_id: str,
+    memory: RollingSummaryMemory
+) -> Job:
+    """
+    Evaluates the session in the background with `chain`, invoked with
+    `inputs` plus the chat history. Returns an already finished job when the
+    same evaluation is cached, and the running job when it is in progress.
+    The job is shared by every session with the same evaluation, so its
+    result carries no session ID; `evaluation_response` adds the caller's.
+    """
+    key = evaluation_key(mode, prompt_path, inputs, memory.transcript())
+    result = _results.get(key)
+    if result is not None:
+        if DEBUG:
+            print(f"♻️ Evaluation of {mode} session {session_id} served from cache.")
+        return evaluation_queue.record("evaluate", {**result, "cached": True})
+
+    job = evaluation_queue.active(key)
+    if job is not None:
+        return job
+
+    snapshot = memory.snapshot()  # the interview may go on while the job waits
+
+    async def evaluate() -> dict:
+        feedback = await _evaluate(key, chain, inputs, snapshot)
+        return {"feedback": feedback, "cached": False}
+
+    return evaluation_queue.submit("evaluate", evaluate, key=key)
+
+async def _evaluate(key: str, chain: Runnable, inputs: dict, memory: RollingSummaryMemory) -> str:
+    with llm_lane("evaluation"):
+        chat_history = await evaluation_history(memory)
+        output = await chain.ainvoke({**inputs, "chat_history": chat_history})
+    feedback = output.content if hasattr(output, "content") else str(output)
+    _results.put(key, {"feedback": feedback})
+    return feedback
+
+async def run_evaluation(
+    mode: str,
+    prompt_path: Path,
+    chain: Runnable,
+    inputs: dict,
+    session_id: str,
+    memory: RollingSummaryMemory
+) -> dict:
+    """
+    Evaluates the session in the caller's task, sharing the cache and any
+    running evaluation job with `submit_evaluation`.
+    """
+    key = evaluation_key(mode, prompt_path, inputs, memory.transcript())
+    result = _results.get(key)
+    if result is None and (job := evaluation_queue.active(key)) is not None:
+        await wait_for_job(job, JOB_STALE_SECONDS)
+        result = _results.get(key)
+    if result is not None:
+        return {**result, "session_id": session_id, "cached": True}
+
+    feedback = await _evaluate(key, chain, inputs, memory.snapshot())
+    return {"session_id": session_id, "feedback": feedback, "cached": False}
+
+def evaluation_response(session_id: str, job: Job) -> dict:
+    response = {"session_id": session_id, "job_id": job.id, "status": job.status}
+    if job.status == "succeeded":
+        response["feedback"] = job.result["feedback"]
+        response["cached"] = job.result["cached"]
+    return response
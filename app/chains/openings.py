@@ -0,0 +1,207 @@
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from typing import AsyncIterator
+
+from app.chains import role_based_chain, jd_based_chain
+from app.chains.registry import prompt_version
+from app.utils.jobs import Job, openings_queue
+from app.utils.llm_gateway import llm_lane
+from app.config.settings import (
+    DEBUG,
+    GEMINI_MODEL,
+    ROLE_PROMPT_PATH,
+    JD_PROMPT_PATH,
+    OPENING_CACHE_ENABLED,
+    OPENING_CACHE_SIZE,
+    OPENING_VARIANTS,
+    OPENING_MAX_SERVES,
+    OPENING_REFILL_MIN_REQUESTS
+)
+
+OPENING_MESSAGE = "Hi, I'm ready to begin for my interview."
+
+# The first turn of a role or JD session is this fixed message with an empty
+# history, so its reply depends only on the role name or job description.
+# A few replies per role / JD are kept and handed out round-robin, so
+# candidates for the same role don't all get the same first question. Each
+# reply is retired after OPENING_MAX_SERVES sessions and the set is topped
+# up in the background, for roles / JDs that are asked for more than once.
+
+_MODES = {
+    "role": (ROLE_PROMPT_PATH, "role_name", role_based_chain.get_role_conversation_chain),
+    "jd": (JD_PROMPT_PATH, "job_desc", jd_based_chain.get_role_conversation_chain),
+}
+
+class _Openings:
+    def __init__(self, mode: str, value: str):
+        self.mode = mode
+        self.value = value
+        self.variants: list[str] = []
+        self.served: list[int] = []  # sessions each variant has opened
+        self.cursor = 0
+        self.requests = 0
+        self.pinned = False  # warmed up by an admin: refilled regardless of traffic
+
+_openings: OrderedDict[str, _Openings] = OrderedDict()
+_refills: dict[str, asyncio.Task] = {}
+_hits = 0
+_misses = 0
+
+def opening_key(mode: str, value: str) -> str:
+    """Hash of (mode, model, prompt version, role name or JD), whitespace-normalized."""
+    normalized = " ".join(value.split())
+    if mode == "role":
+        normalized = normalized.casefold()
+    material = json.dumps(
+        [mode, GEMINI_MODEL, prompt_version(_MODES[mode][0]), normalized], ensure_ascii=False
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+def _entry(mode: str, value: str) -> tuple[str, _Openings]:
+    key = opening_key(mode, value)
+    entry = _openings.get(key)
+    if entry is None:
+        entry = _openings[key] = _Openings(mode, value)
+        while len(_openings) > OPENING_CACHE_SIZE:
+            _openings.popitem(last=False)
+    _openings.move_to_end(key)
+    return key, entry
+
+async def _generate(mode: str, value: str) -> str:
+    _, field, get_chain = _MODES[mode]
+    return await get_chain().ainvoke({field: value, "chat_history": "", "input": OPENING_MESSAGE})
+
+def _take(mode: str, value: str) -> str | None:
+    global _hits, _misses
+    key, entry = _entry(mode, value)
+    entry.requests += 1
+    if not entry.variants:
+        _misses += 1
+        return None
+
+    _hits += 1
+    i = entry.cursor % len(entry.variants)
+    reply = entry.variants[i]
+    entry.served[i] += 1
+    if entry.served[i] >= OPENING_MAX_SERVES:
+        del entry.variants[i], entry.served[i]  # the cursor now points at the next one
+    else:
+        entry.cursor = i + 1
+    _refill_if_needed(key, entry)
+    if DEBUG:
+        print(f"🧊 Opening for {mode} '{value[:40]}' served from cache.")
+    return reply
+
+def _remember(mode: str, value: str, reply: str):
+    key, entry = _entry(mode, value)
+    if reply and len(entry.variants) < OPENING_VARIANTS:
+        entry.variants.append(reply)
+        entry.served.append(1)
+    _refill_if_needed(key, entry)
+
+def _refill_if_needed(key: str, entry: _Openings):
+    if len(entry.variants) >= OPENING_VARIANTS or key in _refills:
+        return
+    if not entry.pinned and entry.requests < OPENING_REFILL_MIN_REQUESTS:
+        return
+    with llm_lane("background"):
+        task = asyncio.ensure_future(_refill(entry))
+    _refills[key] = task
+    task.add_done_callback(lambda t: _refilled(key, entry, t))
+
+async def _refill(entry: _Openings) -> int:
+    added = 0
+    while len(entry.variants) < OPENING_VARIANTS:
+        reply = await _generate(entry.mode, entry.value)
+        if len(entry.variants) < OPENING_VARIANTS:  # a live reply may have landed meanwhile
+            entry.variants.append(reply)
+            entry.served.append(0)
+            added += 1
+    if DEBUG and added:
+        print(f"🧊 {added} opening variants cached for {entry.mode} '{entry.value[:40]}'.")
+    return added
+
+def _refilled(key: str, entry: _Openings, task: asyncio.Task):
+    _refills.pop(key, None)
+    if not task.cancelled() and task.exception():
+        print(f"❌ Opening refill failed for {entry.mode} '{entry.value[:40]}': {task.exception()}")
+
+# ─── Public API ──────────────────────────────────────────────────────────
+
+async def opening_reply(mode: str, value: str) -> str:
+    """
+    Reply to OPENING_MESSAGE for a new `mode` ("role" or "jd") session on
+    `value` (the role name or JD): a cached variant when there is one,
+    otherwise a fresh reply, which is then cached.
+    """
+    reply = _take(mode, value) if OPENING_CACHE_ENABLED else None
+    if reply is None:
+        reply = await _generate(mode, value)
+        if OPENING_CACHE_ENABLED:
+            _remember(mode, value, reply)
+    return reply
+
+async def opening_tokens(mode: str, value: str) -> AsyncIterator[str]:
+    """
+    Streaming counterpart of `opening_reply`: a cached variant is sent as a
+    single chunk; a fresh reply is streamed and cached once complete.
+    """
+    reply = _take(mode, value) if OPENING_CACHE_ENABLED else None
+    if reply is not None:
+        yield reply
+        return
+
+    _, field, get_chain = _MODES[mode]
+    parts: list[str] = []
+    async for token in get_chain().astream({field: value, "chat_history": "", "input": OPENING_MESSAGE}):
+        parts.append(token)
+        yield token
+    if OPENING_CACHE_ENABLED:
+        _remember(mode, value, "".join(parts))
+
+def warm_openings(targets: list[tuple[str, str]]) -> Job:
+    """
+    Fills the cache for (mode, role name / JD) pairs on the openings job
+    queue and keeps them topped up afterwards, however rarely they're asked for.
+    """
+    async def warm() -> dict:
+        tasks = []
+        for mode, value in targets:
+            key, entry = _entry(mode, value)
+            entry.pinned = True
+            _refill_if_needed(key, entry)
+            if key in _refills:
+                tasks.append(_refills[key])
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        return {
+            "targets": len(targets),
+            "variants_added": sum(r for r in results if isinstance(r, int)),
+            "failed": sum(isinstance(r, BaseException) for r in results),
+        }
+
+    return openings_queue.submit("warm_openings", warm)
+
+def opening_stats(top: int = 0) -> dict:
+    stats = {
+        "enabled": OPENING_CACHE_ENABLED,
+        "keys": len(_openings),
+        "variants": sum(len(entry.variants) for entry in _openings.values()),
+        "hits": _hits,
+        "misses": _misses,
+        "refilling": len(_refills),
+    }
+    if top:
+        popular = sorted(_openings.values(), key=lambda entry: entry.requests, reverse=True)[:top]
+        stats["top"] = [
+            {
+                "mode": entry.mode,
+                "value": entry.value[:80],
+                "requests": entry.requests,
+                "variants": len(entry.variants),
+                "pinned": entry.pinned,
+            }
+            for entry in popular
+        ]
+    return stats
@@ -0,0 +1,183 @@
+import asyncio
+import re
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import Runnable
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from app.chains.registry import get_chain, get_prompt, prompt_version
+from app.chains.role_based_chain import get_role_conversation_chain
+from app.memory.rolling_summary import RollingSummaryMemory
+from app.utils.question_bank import BankQuestion, QuestionBank, bank_path
+from app.config.settings import (
+    DEBUG,
+    GEMINI_MODEL,
+    ROLE_PROMPT_PATH,
+    QUESTION_BANK_DIR,
+    QUESTION_BANK_TOPICS_PROMPT_PATH,
+    QUESTION_BANK_LEVELS,
+    QUESTION_BANK_TURNS_PER_LEVEL,
+    QUESTION_BANK_FOLLOW_UP_EVERY,
+    QUESTION_BANK_MIN_ANSWER_WORDS,
+    QUESTION_BANK_CACHE_SIZE
+)
+
+# ─── Generation (offline, see scripts/question_bank.py) ──────────────────
+# Questions come from the live role conversation chain (role_prompt.txt),
+# steered one topic and level at a time, so banked questions read exactly
+# like live ones.
+
+def _build_topics_chain(llm: ChatGoogleGenerativeAI) -> Runnable:
+    prompt = get_prompt(QUESTION_BANK_TOPICS_PROMPT_PATH, ("role_name", "count"))
+    return prompt | llm | StrOutputParser()
+
+def get_topics_chain() -> Runnable:
+    return get_chain("role", "bank_topics", _build_topics_chain)
+
+async def generate_topics(role_name: str, count: int) -> list[str]:
+    text = await get_topics_chain().ainvoke({"role_name": role_name, "count": count})
+    topics = {}
+    for line in text.splitlines():
+        topic = re.sub(r"^\s*(?:[-*•]|\d+[.)])\s*", "", line).strip().rstrip(".")
+        if topic:
+            topics.setdefault(topic.casefold(), topic)
+    return list(topics.values())[:count]
+
+async def _generate_topic(role_name: str, topic_index: int, topic: str, per_level: int) -> list[BankQuestion]:
+    memory = RollingSummaryMemory()  # earlier questions on the topic, so the prompt avoids repeats
+    questions, seen = [], set()
+    for level_index, level in enumerate(QUESTION_BANK_LEVELS):
+        for _ in range(per_level):
+            message = f"(Ask your next question about {topic}, at {level} level. Reply with the question only.)"
+            reply = await get_role_conversation_chain().ainvoke({
+                "role_name": role_name,
+                "chat_history": memory.render(),
+                "input": message
+            })
+            memory.add_turn(message, reply)
+            key = " ".join(reply.split()).casefold()
+            if key and key not in seen:
+                seen.add(key)
+                questions.append(BankQuestion(reply.strip(), topic_index, level_index))
+    return questions
+
+async def build_bank(role_name: str, topics: list[str], per_level: int) -> QuestionBank:
+    """Generates `per_level` questions per topic and level, all topics in parallel."""
+    per_topic = await asyncio.gather(*(
+        _generate_topic(role_name, i, topic, per_level) for i, topic in enumerate(topics)
+    ))
+    return QuestionBank(
+        role_name=role_name,
+        topics=topics,
+        levels=list(QUESTION_BANK_LEVELS),
+        questions=[question for questions in per_topic for question in questions],
+        prompt_version=prompt_version(ROLE_PROMPT_PATH),
+        model=GEMINI_MODEL
+    )
+
+# ─── Serving ─────────────────────────────────────────────────────────────
+
+_counts = {"served": 0, "follow_ups": 0, "exhausted": 0, "no_bank": 0}
+
+@lru_cache(maxsize=QUESTION_BANK_CACHE_SIZE)
+def _load(path: Path, mtime_ns: int) -> QuestionBank | None:
+    bank = QuestionBank.load(path)
+    if bank.prompt_version != prompt_version(ROLE_PROMPT_PATH):
+        print(f"⚠️ Question bank for '{bank.role_name}' predates the current role prompt; rebuild it to serve from it.")
+        return None
+    if DEBUG:
+        print(f"📚 Loaded question bank for '{bank.role_name}' ({len(bank)} questions).")
+    return bank
+
+def get_bank(role_name: str) -> QuestionBank | None:
+    path = bank_path(QUESTION_BANK_DIR, role_name)
+    try:
+        mtime_ns = path.stat().st_mtime_ns  # a rebuilt bank is picked up without a restart
+    except FileNotFoundError:
+        return None
+    return _load(path, mtime_ns)
+
+class BankPick(NamedTuple):
+    version: str  # bank the index refers to
+    index: int
+    text: str
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#.-]*")
+_STOPWORDS = frozenset(
+    "about also been being could does doing from have just like more most much "
+    "really some such than that their them then there these they thing things this "
+    "very what when where which while with would your yours".split()
+)
+
+def _stems(text: str) -> set[str]:
+    """Content words of `text`, cut to five letters so "consistent" meets "consistency"."""
+    return {word[:5] for word in _WORD.findall(text.lower()) if len(word) > 3 and word not in _STOPWORDS}
+
+def _needs_follow_up(session, message: str) -> bool:
+    """
+    Whether the candidate's answer calls for a live reply rather than the
+    next bank question: it is too thin to move on from (a one-liner, "I
+    don't know", a request to repeat or clarify), or it doesn't engage with
+    the question it answers, i.e. shares no content word with the previous
+    reply (the candidate went off on a tangent or asked something back).
+    """
+    if len(message.split()) < QUESTION_BANK_MIN_ANSWER_WORDS:
+        return True
+    if not session.memory.turns:
+        return False
+    asked = _stems(session.memory.turns[-1][1])
+    return bool(asked) and not asked & _stems(message)
+
+def next_bank_question(sid: str, session, message: str) -> BankPick | None:
+    """
+    Picks the bank question that answers the candidate's `message`, or
+    returns None when the turn needs the LLM: the answer calls for a
+    follow-up, one is due after QUESTION_BANK_FOLLOW_UP_EVERY bank
+    questions, or there's no (unasked) bank question for the role.
+    The session is left untouched; the turn is recorded with
+    `record_bank_turn` once its reply has been sent.
+    """
+    bank = get_bank(session.role_name)
+    if bank is None:
+        _counts["no_bank"] += 1
+        return None
+    current = session.bank_version == bank.version
+    asked = session.bank_asked if current else []
+    streak = session.bank_streak if current else 0
+
+    if _needs_follow_up(session, message) or (QUESTION_BANK_FOLLOW_UP_EVERY and streak >= QUESTION_BANK_FOLLOW_UP_EVERY):
+        _counts["follow_ups"] += 1
+        return None
+
+    index = bank.pick(
+        asked,
+        turn=session.memory.message_count,
+        turns_per_level=QUESTION_BANK_TURNS_PER_LEVEL,
+        seed=zlib.crc32(sid.encode("utf-8"))
+    )
+    if index is None:
+        _counts["exhausted"] += 1
+        return None
+
+    _counts["served"] += 1
+    if DEBUG:
+        print(f"📚 Question {index} of the '{bank.role_name}' bank served.")
+    return BankPick(bank.version, index, bank.questions[index].text)
+
+def record_bank_turn(session, pick: BankPick | None):
+    """Records a completed turn: the bank question asked, or None for a live reply."""
+    if pick is None:
+        session.bank_streak = 0
+        return
+    if session.bank_version != pick.version:
+        session.bank_version, session.bank_asked, session.bank_streak = pick.version, [], 0
+    session.bank_asked.append(pick.index)
+    session.bank_streak += 1
+
+def question_bank_stats() -> dict:
+    info = _load.cache_info()
+    return {**_counts, "banks_loaded": info.currsize}
@@ -0,0 +1,761 @@
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+import uuid
+from typing import List
+
+import numpy as np
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain.docstore.document import Document
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores.utils import maximal_marginal_relevance
+from starlette.concurrency import run_in_threadpool
+
+from qdrant_client.models import (
+    VectorParams, Distance, Filter, FieldCondition, MatchValue, MatchAny, PointStruct, Range, PayloadSchemaType,
+    KeywordIndexParams, KeywordIndexType, DatetimeRange, IsEmptyCondition, PayloadField
+)
+
+from app.chains.registry import get_embedding_model, get_embedding_cache, get_async_qdrant_client
+from app.memory.store import document_in_use
+from app.utils.vector_index import DocumentIndex, LocalIndexStore
+from app.utils.qdrant_config import collection_config, config_updates, search_params
+from app.utils.llm_gateway import llm_lane
+from app.config.settings import (
+    CHUNK_SIZE,
+    CHUNK_OVERLAP,
+    SEARCH_TYPE,
+    K,
+    FETCH_K,
+    LAMBDA_MULT,
+    VECTOR_DIM,
+    DEBUG,
+    COLLECTION_NAME,
+    EMBEDDING_CACHE_ENABLED,
+    FALLBACK_CONTEXT_CHARS,
+    RETRIEVAL_BACKEND,
+    LOCAL_INDEX_MAX_DOCUMENTS,
+    LOCAL_INDEX_QDRANT_COPY,
+    QUERY_CACHE_SIZE,
+    RETRIEVAL_MIN_WORDS,
+    UPSERT_BATCH_SIZE,
+    INGEST_PARALLEL_BATCHES,
+    MAX_CHUNK_USAGE
+)
+
+# Shared by the resume and hybrid chains. Everything that talks to Qdrant or
+# the embedding API is awaited, and CPU-bound splitting runs in the thread
+# pool, so a long upload never stalls other candidates' turns.
+
+_splitter = RecursiveCharacterTextSplitter(
+    chunk_size=CHUNK_SIZE,
+    chunk_overlap=CHUNK_OVERLAP,
+    add_start_index=True
+)
+
+def _document_filter(document_id: str, exclude_chunk_ids: List[str] = ()) -> Filter:
+    return Filter(
+        must=[FieldCondition(key="document_id", match=MatchValue(value=document_id))],
+        must_not=[
+            FieldCondition(key="metadata.chunk_id", match=MatchAny(any=list(exclude_chunk_ids)))
+        ] if exclude_chunk_ids else None
+    )
+
+def document_fingerprint(text: str) -> str:
+    """
+    Content address of an uploaded resume. Sessions uploading the same text
+    share one set of points in Qdrant, referenced by this ID.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+# ─── Document Ingestion ──────────────────────────────────────────────────
+# Chunk counts of documents known to be fully written to Qdrant. Readiness
+# belongs to the document rather than the session, so any worker can
+# confirm it from Qdrant.
+_document_chunks: dict[str, int] = {}
+
+# Ingestions currently running in this process, so simultaneous uploads of
+# the same resume wait for one upsert instead of writing the chunks twice.
+_inflight: dict[str, asyncio.Task] = {}
+
+# With `RETRIEVAL_BACKEND = "local"`, turns are answered from per-document
+# NumPy indexes in this process; Qdrant, if kept, is the durable copy they
+# are rebuilt from after a restart or on another worker.
+_USE_LOCAL_INDEX = RETRIEVAL_BACKEND == "local"
+_USE_QDRANT = not _USE_LOCAL_INDEX or LOCAL_INDEX_QDRANT_COPY
+_local_indexes = LocalIndexStore(LOCAL_INDEX_MAX_DOCUMENTS)
+
+# Indexed payload fields: every search and delete filters on `document_id`,
+# searches exclude used chunks by `metadata.chunk_id`, and cleanup selects
+# expired points by the numeric `created_at` (epoch).
+#
+# `document_id` is the tenant key. Resume and hybrid sessions uploading the
+# same resume share its points, so documents rather than modes are the
+# partitions: Qdrant stores each document's points together and a filtered
+# search only reads that partition.
+_PAYLOAD_INDEXES = {
+    "document_id": KeywordIndexParams(type=KeywordIndexType.KEYWORD, is_tenant=True),
+    "metadata.chunk_id": PayloadSchemaType.KEYWORD,
+    "created_at": PayloadSchemaType.FLOAT,
+}
+_collection_ready = False
+
+_POINT_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, f"qdrant/{COLLECTION_NAME}")
+
+class CollectionConfigError(RuntimeError):
+    """Raised when the existing collection doesn't match the configured vectors."""
+
+def _index_outdated(info, field_schema) -> bool:
+    is_tenant = getattr(field_schema, "is_tenant", None)
+    return bool(is_tenant) and not getattr(info.params, "is_tenant", False)
+
+async def _ensure_collection(qdrant_client):
+    global _collection_ready
+    if _collection_ready:
+        return
+    if not await qdrant_client.collection_exists(COLLECTION_NAME):
+        # Concurrent creators (other workers) race harmlessly: the loser's
+        # create fails, and the collection is re-read below.
+        try:
+            await qdrant_client.create_collection(
+                collection_name=COLLECTION_NAME,
+                **collection_config()
+            )
+        except Exception:
+            if not await qdrant_client.collection_exists(COLLECTION_NAME):
+                raise
+
+    info = await qdrant_client.get_collection(COLLECTION_NAME)
+    vectors = info.config.params.vectors
+    if isinstance(vectors, VectorParams) and (vectors.size, vectors.distance) != (VECTOR_DIM, Distance.COSINE):
+        raise CollectionConfigError(
+            f"Collection '{COLLECTION_NAME}' has {vectors.size}-d {vectors.distance} vectors, "
+            f"expected {VECTOR_DIM}-d Cosine. Use another COLLECTION_NAME or migrate it."
+        )
+
+    updates = config_updates(info.config)
+    if updates:
+        # Qdrant rebuilds the index and quantized vectors in the background;
+        # searches keep working meanwhile.
+        print(f"🔧 Collection '{COLLECTION_NAME}' {', '.join(updates)} differ from the settings, updating.")
+        try:
+            await qdrant_client.update_collection(collection_name=COLLECTION_NAME, **updates)
+        except Exception as e:
+            print(f"⚠️ Could not update collection '{COLLECTION_NAME}', it keeps its old settings: {e}")
+
+    for field, field_schema in _PAYLOAD_INDEXES.items():
+        existing = info.payload_schema.get(field)
+        if existing is not None and _index_outdated(existing, field_schema):
+            # Re-indexing doesn't touch the points themselves.
+            await qdrant_client.delete_payload_index(collection_name=COLLECTION_NAME, field_name=field)
+            existing = None
+        if existing is None:
+            await qdrant_client.create_payload_index(
+                collection_name=COLLECTION_NAME,
+                field_name=field,
+                field_schema=field_schema
+            )
+    _collection_ready = True
+
+async def bootstrap_collection():
+    """
+    Creates and validates the collection once at startup, so uploads don't
+    pay for it. If Qdrant isn't reachable yet, the first ingestion retries;
+    a collection with the wrong vector configuration fails startup.
+    """
+    if not _USE_QDRANT:
+        return
+    try:
+        await _ensure_collection(get_async_qdrant_client())
+        if DEBUG:
+            print(f"🗄 Collection '{COLLECTION_NAME}' ready.")
+    except CollectionConfigError:
+        raise
+    except Exception as e:
+        print(f"⚠️ Qdrant not reachable at startup, retrying on first upload: {e}")
+
+async def ingest_documents(document_id: str, docs: List[Document]) -> int:
+    """
+    Makes sure the chunks of `document_id` are in Qdrant and returns how
+    many there are. Already-ingested documents are only touched, so their
+    `created_at` reflects the latest upload for cleanup purposes.
+    """
+    task = _inflight.get(document_id)
+    if task is None:
+        with llm_lane("ingestion"):  # embedding calls queue behind interview turns
+            task = asyncio.ensure_future(_ingest_once(document_id, docs))
+        _inflight[document_id] = task
+        task.add_done_callback(lambda _: _inflight.pop(document_id, None))
+    return await asyncio.shield(task)
+
+async def _ingest_once(document_id: str, docs: List[Document]) -> int:
+    if _USE_LOCAL_INDEX and (index := _local_indexes.get(document_id)) is not None:
+        if _USE_QDRANT:
+            await get_async_qdrant_client().set_payload(
+                collection_name=COLLECTION_NAME,
+                payload={"created_at": time.time()},
+                points=_document_filter(document_id)
+            )
+        return len(index)
+
+    chunks = await run_in_threadpool(_splitter.split_documents, docs)
+    texts = [doc.page_content for doc in chunks]
+    metadatas = [{**(doc.metadata or {}), "chunk_id": f"{document_id}_{i}"} for i, doc in enumerate(chunks)]
+
+    if _USE_QDRANT:
+        qdrant_client = get_async_qdrant_client()
+        await _ensure_collection(qdrant_client)
+
+        # A failed upload removes its points, and point IDs are deterministic,
+        # so a document left half-written anyway (e.g. by a crash) is simply
+        # written again over the same points.
+        existing = (await qdrant_client.count(
+            collection_name=COLLECTION_NAME,
+            count_filter=_document_filter(document_id),
+            exact=True
+        )).count
+        if existing == len(chunks):
+            await qdrant_client.set_payload(
+                collection_name=COLLECTION_NAME,
+                payload={"created_at": time.time()},
+                points=_document_filter(document_id)
+            )
+            if DEBUG:
+                print(f"♻️ Reusing {existing} chunks of document {document_id[:12]}.")
+            if _USE_LOCAL_INDEX:
+                await _load_local_index(document_id)
+            _document_chunks[document_id] = existing
+            return existing
+        if existing > len(chunks):
+            # Chunked differently before (e.g. other CHUNK_SIZE): start over.
+            await qdrant_client.delete(
+                collection_name=COLLECTION_NAME,
+                points_selector=_document_filter(document_id)
+            )
+
+    if DEBUG:
+        print(f"📥 Ingesting Text \n: {texts}")
+
+    if _USE_QDRANT:
+        embeddings = await _embed_and_upsert(document_id, texts, metadatas)
+    else:
+        embeddings = await get_embedding_model().aembed_documents(texts)
+    if DEBUG and EMBEDDING_CACHE_ENABLED:
+        print(f"🗃 Embedding cache: {get_embedding_cache().stats()}")
+
+    if _USE_LOCAL_INDEX:
+        _local_indexes.put(document_id, DocumentIndex(texts, metadatas, embeddings))
+
+    if DEBUG:
+        print(f"✅ Successfully ingested {len(texts)} chunks.")
+
+    if _USE_QDRANT:
+        _document_chunks[document_id] = len(texts)
+    return len(texts)
+
+def point_id(document_id: str, index: int) -> str:
+    """Deterministic ID of a chunk's point: re-uploading writes the same points."""
+    return str(uuid.uuid5(_POINT_NAMESPACE, f"{document_id}/{index}"))
+
+async def _embed_and_upsert(document_id: str, texts: List[str], metadatas: List[dict]) -> List[List[float]]:
+    """
+    Embeds and writes the chunks in batches of `UPSERT_BATCH_SIZE`, up to
+    `INGEST_PARALLEL_BATCHES` at a time, so embedding one batch overlaps
+    with writing the previous ones. All batches but the last are sent with
+    `wait=False`; the last is sent with `wait=True` once the others are
+    acknowledged, and Qdrant applies a collection's updates in order, so
+    when it returns every chunk is searchable. If any batch fails, the rest
+    are cancelled and the document's points deleted before re-raising.
+    """
+    if not texts:
+        return []
+    qdrant_client = get_async_qdrant_client()
+    limit = asyncio.Semaphore(INGEST_PARALLEL_BATCHES)
+    created_at = time.time()
+    batches = [range(i, min(i + UPSERT_BATCH_SIZE, len(texts))) for i in range(0, len(texts), UPSERT_BATCH_SIZE)]
+
+    async def embed(batch: range) -> List[List[float]]:
+        async with limit:
+            return await get_embedding_model().aembed_documents([texts[i] for i in batch])
+
+    async def upsert(batch: range, vectors: List[List[float]], wait: bool):
+        await qdrant_client.upsert(
+            collection_name=COLLECTION_NAME,
+            points=[
+                PointStruct(
+                    id=point_id(document_id, i),
+                    vector=vector,
+                    payload={
+                        "page_content": texts[i],
+                        "document_id": document_id,
+                        "chunk_count": len(texts),
+                        "created_at": created_at,
+                        "metadata": metadatas[i],
+                    }
+                )
+                for i, vector in zip(batch, vectors)
+            ],
+            wait=wait
+        )
+
+    async def send(batch: range) -> List[List[float]]:
+        vectors = await embed(batch)
+        await upsert(batch, vectors, wait=False)
+        return vectors
+
+    *head, last = batches
+    sends = [asyncio.ensure_future(send(batch)) for batch in head]
+    last_vectors = asyncio.ensure_future(embed(last))
+    try:
+        head_vectors = await asyncio.gather(*sends)
+        await upsert(last, await last_vectors, wait=True)
+    except Exception:
+        # Stop the sibling batches, then remove whatever they already wrote,
+        # so a failed ingestion doesn't leave the document half-written.
+        for task in (*sends, last_vectors):
+            task.cancel()
+        await asyncio.gather(*sends, last_vectors, return_exceptions=True)
+        try:
+            await qdrant_client.delete(
+                collection_name=COLLECTION_NAME,
+                points_selector=_document_filter(document_id)
+            )
+        except Exception as e:
+            print(f"❌ Failed to remove partial document {document_id}: {e}")
+        raise
+    finally:
+        last_vectors.cancel()
+    return [vector for vectors in (*head_vectors, last_vectors.result()) for vector in vectors]
+
+async def document_chunk_count(document_id: str | None) -> int:
+    """
+    Number of searchable chunks of the document; 0 until ingestion has
+    finished, in which case callers should skip retrieval.
+    """
+    if not document_id:
+        return 0
+    if _USE_LOCAL_INDEX and (index := _local_indexes.get(document_id)) is not None:
+        return len(index)
+    if not _USE_QDRANT:
+        return 0
+    if document_id in _document_chunks:
+        return _document_chunks[document_id]
+    if document_id in _inflight:
+        return 0
+    try:
+        qdrant_client = get_async_qdrant_client()
+        count = (await qdrant_client.count(
+            collection_name=COLLECTION_NAME,
+            count_filter=_document_filter(document_id),
+            exact=True
+        )).count
+        if count:
+            # Another worker may still be writing the document's batches.
+            points, _ = await qdrant_client.scroll(
+                collection_name=COLLECTION_NAME,
+                scroll_filter=_document_filter(document_id),
+                limit=1,
+                with_payload=["chunk_count"]
+            )
+            if count < (points[0].payload or {}).get("chunk_count", count):
+                return 0
+    except Exception:
+        return 0  # collection not created yet
+    if count:
+        _document_chunks[document_id] = count
+    return count
+
+def fallback_context(resume_text: str, limit: int = FALLBACK_CONTEXT_CHARS) -> str:
+    """
+    Context for turns without fresh chunks: the start of the resume, cut at
+    a line break, instead of the whole document.
+    """
+    if len(resume_text) <= limit:
+        return resume_text
+    cut = resume_text.rfind("\n", 0, limit)
+    return resume_text[:cut if cut > limit // 2 else limit]
+
+# ─── In-Process Index ────────────────────────────────────────────────────
+async def _load_local_index(document_id: str) -> DocumentIndex | None:
+    """Rebuilds a document's local index from the vectors stored in Qdrant."""
+    points, offset = [], None
+    while True:
+        page, offset = await get_async_qdrant_client().scroll(
+            collection_name=COLLECTION_NAME,
+            scroll_filter=_document_filter(document_id),
+            limit=256,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True
+        )
+        points.extend(page)
+        if offset is None:
+            break
+    if not points:
+        return None
+
+    points.sort(key=lambda point: int(point.payload["metadata"]["chunk_id"].rsplit("_", 1)[1]))
+    index = DocumentIndex(
+        [point.payload.get("page_content", "") for point in points],
+        [point.payload.get("metadata", {}) for point in points],
+        [point.vector for point in points]
+    )
+    _local_indexes.put(document_id, index)
+    if DEBUG:
+        print(f"📦 Loaded {len(index)} chunks of document {document_id[:12]} into the local index.")
+    return index
+
+async def _get_local_index(document_id: str) -> DocumentIndex | None:
+    index = _local_indexes.get(document_id)
+    if index is None and _USE_QDRANT and document_id not in _inflight:
+        index = await _load_local_index(document_id)
+    return index
+
+def local_index_stats() -> dict | None:
+    return _local_indexes.stats() if _USE_LOCAL_INDEX else None
+
+# ─── Query Cache ─────────────────────────────────────────────────────────
+# Greetings, "yes", "can you repeat" and retried turns repeat the same few
+# inputs. Query vectors are cached by normalized text; search results also
+# by document and by the chunks excluded, so they go stale (and are no
+# longer hit) as soon as a session's chunk usage changes.
+_query_vectors: OrderedDict[str, list[float]] = OrderedDict()
+_search_results: OrderedDict[tuple, list[Document]] = OrderedDict()
+_query_cache_hits = {"vectors": 0, "results": 0}
+
+def normalize_query(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+def is_trivial_query(text: str) -> bool:
+    """Messages too short to say anything about the resume, e.g. "yes" or "ok, go on"."""
+    return len(normalize_query(text).split()) < RETRIEVAL_MIN_WORDS
+
+def _cached(cache: OrderedDict, key):
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+def _cache(cache: OrderedDict, key, value):
+    cache[key] = value
+    cache.move_to_end(key)
+    if len(cache) > QUERY_CACHE_SIZE:
+        cache.popitem(last=False)
+
+def _evict_query_cache(document_id: str):
+    """
+    Drops the document's cached search results. Query vectors depend only
+    on the query text, so they stay valid for other documents and are kept.
+    """
+    for key in [key for key in _search_results if key[0] == document_id]:
+        del _search_results[key]
+
+def query_cache_stats() -> dict:
+    return {
+        "vectors": len(_query_vectors),
+        "results": len(_search_results),
+        "vector_hits": _query_cache_hits["vectors"],
+        "result_hits": _query_cache_hits["results"],
+    }
+
+# ─── Session-Based Retriever ─────────────────────────────────────────────
+async def search_document(
+    document_id: str,
+    query: str,
+    search_type: str = SEARCH_TYPE,
+    k: int = K,
+    fetch_k: int = FETCH_K,
+    lambda_mult: float = LAMBDA_MULT,
+    exclude_chunk_ids: List[str] = (),
+) -> List[Document]:
+    """
+    Embeds `query` and searches the document's chunks, re-ranking with MMR
+    when `search_type == "mmr"`. Chunks in `exclude_chunk_ids` are filtered
+    out by Qdrant, not after the fact.
+
+    With the local backend the search runs on the document's in-process
+    index, and only the query embedding leaves the process. Repeated
+    queries are answered from the query cache.
+    """
+    normalized = normalize_query(query)
+    result_key = (document_id, normalized, search_type, k, fetch_k, lambda_mult, frozenset(exclude_chunk_ids))
+    docs = _cached(_search_results, result_key)
+    if docs is not None:
+        _query_cache_hits["results"] += 1
+        return list(docs)
+
+    query_vector = _cached(_query_vectors, normalized)
+    if query_vector is None:
+        query_vector = await get_embedding_model().aembed_query(query)
+        _cache(_query_vectors, normalized, query_vector)
+    else:
+        _query_cache_hits["vectors"] += 1
+
+    docs = await _search(document_id, query_vector, search_type, k, fetch_k, lambda_mult, exclude_chunk_ids)
+    if docs:
+        _cache(_search_results, result_key, docs)
+    return list(docs)
+
+async def _search(
+    document_id: str,
+    query_vector: list[float],
+    search_type: str,
+    k: int,
+    fetch_k: int,
+    lambda_mult: float,
+    exclude_chunk_ids: List[str],
+) -> List[Document]:
+    use_mmr = search_type == "mmr"
+
+    if _USE_LOCAL_INDEX:
+        index = await _get_local_index(document_id)
+        if index is None:
+            return []
+        positions = index.search(
+            query_vector,
+            k=k,
+            fetch_k=fetch_k,
+            lambda_mult=lambda_mult,
+            mmr=use_mmr,
+            exclude_chunk_ids=exclude_chunk_ids
+        )
+        return [
+            Document(page_content=index.texts[i], metadata=index.metadatas[i])
+            for i in positions
+        ]
+
+    response = await get_async_qdrant_client().query_points(
+        collection_name=COLLECTION_NAME,
+        query=query_vector,
+        query_filter=_document_filter(document_id, exclude_chunk_ids),
+        search_params=search_params(),
+        limit=fetch_k if use_mmr else k,
+        with_payload=True,
+        with_vectors=use_mmr
+    )
+    points = response.points
+
+    if use_mmr and points:
+        selected = maximal_marginal_relevance(
+            np.array(query_vector, dtype=np.float32),
+            [point.vector for point in points],
+            lambda_mult=lambda_mult,
+            k=k
+        )
+        points = [points[i] for i in selected]
+
+    return [
+        Document(
+            page_content=(point.payload or {}).get("page_content", ""),
+            metadata=(point.payload or {}).get("metadata", {})
+        )
+        for point in points
+    ]
+
+class SessionRetriever(BaseRetriever):
+    """
+    Async-only retriever over the chunks of the document a session points
+    at. Cheap to construct, so a fresh one can be bound per turn.
+    """
+    document_id: str
+    search_type: str = SEARCH_TYPE
+    k: int = K
+    fetch_k: int = FETCH_K
+    lambda_mult: float = LAMBDA_MULT
+    exclude_chunk_ids: List[str] = []
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        raise NotImplementedError("SessionRetriever is async-only; use `ainvoke`.")
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return await search_document(
+            self.document_id,
+            query,
+            search_type=self.search_type,
+            k=self.k,
+            fetch_k=self.fetch_k,
+            lambda_mult=self.lambda_mult,
+            exclude_chunk_ids=self.exclude_chunk_ids
+        )
+
+def get_session_retriever(document_id: str, exclude_chunk_ids: List[str] = (), k: int = K) -> SessionRetriever:
+    return SessionRetriever(document_id=document_id, exclude_chunk_ids=list(exclude_chunk_ids), k=k)
+
+# ─── Context Enrichment ──────────────────────────────────────────────────
+async def enrich_with_context(inputs: dict, extra_fields: tuple[str, ...] = ()) -> dict:
+    """
+    Builds the prompt variables for a RAG turn: retrieves the session
+    document's chunks that are still under MAX_CHUNK_USAGE (or falls back to
+    the start of the resume) and passes `input`, `chat_history` and
+    `extra_fields` through from `inputs`.
+    """
+    session = inputs["session"]
+    query = inputs.get("query", inputs["input"])  # the candidate's own words, without turn instructions
+    if DEBUG:
+        print("🔍 Retrieving context for input:", query)
+
+    chunk_usage = session.chunk_usage
+    # Usage is counted by the caller once the reply is complete, so a failed
+    # or abandoned turn doesn't use up the chunks it retrieved.
+    used_chunks = inputs.get("used_chunks", [])
+    exhausted = [cid for cid, count in chunk_usage.items() if count >= MAX_CHUNK_USAGE]
+    trivial = is_trivial_query(query)
+    total = 0 if trivial else await document_chunk_count(session.document_id)
+    remaining = total - len(exhausted)
+
+    if trivial:
+        if DEBUG:
+            print("💬 Short message, skipping retrieval.")
+        docs = []
+    elif not total:
+        if DEBUG:
+            print("⏳ Vectors not ready yet, skipping retrieval.")
+        docs = []
+    elif remaining <= 0:
+        if DEBUG:
+            print("📭 Every chunk has been used, skipping retrieval.")
+        docs = []
+    else:
+        retriever = get_session_retriever(session.document_id, exclude_chunk_ids=exhausted, k=min(K, remaining))
+        docs = await retriever.ainvoke(query)
+
+    filtered_docs = []
+    for doc in docs:
+        cid = doc.metadata.get("chunk_id")
+        if not cid:
+            if DEBUG:
+                print("⚠️ Skipping chunk due to missing chunk_id.")
+            continue
+        count = chunk_usage.get(cid, 0)
+        if DEBUG:
+            print(f"Chunk usage for {cid}: {count}")
+        if count < MAX_CHUNK_USAGE:
+            filtered_docs.append(doc)
+            used_chunks.append(cid)
+        else:
+            if DEBUG:
+                print("⚠️ Skipping chunk due to usage threshold.")
+
+    if not filtered_docs:
+        if DEBUG:
+            print("⚠️ No relevant chunks found. Using the start of the resume as fallback.")
+        context = fallback_context(session.resume_text)
+    else:
+        context = "\n\n".join(doc.page_content for doc in filtered_docs)
+        if DEBUG:
+            print("📥 Retrieved context:\n", context[:500])
+
+    return {
+        "context": context,
+        "input": inputs["input"],
+        "chat_history": inputs.get("chat_history", ""),
+        **{field: inputs[field] for field in extra_fields}
+    }
+
+# ─── Document Release ────────────────────────────────────────────────────
+async def delete_document(document_id: str):
+    try:
+        if DEBUG:
+            print(f"🗑 Deleting document: {document_id}")
+        _local_indexes.pop(document_id)
+        _evict_query_cache(document_id)
+        if _USE_QDRANT:
+            await get_async_qdrant_client().delete(
+                collection_name=COLLECTION_NAME,
+                points_selector=_document_filter(document_id)
+            )
+        _document_chunks.pop(document_id, None)
+    except Exception as e:
+        print(f"❌ Failed to delete document {document_id}: {e}")
+
+_releases: set[asyncio.Task] = set()
+
+async def _delete_if_unused(document_id: str):
+    # Checked again here: a new upload of the same resume may have claimed
+    # the document between the session's removal and this task running.
+    if document_id in _inflight or document_in_use(document_id):
+        return
+    await delete_document(document_id)
+
+def release_document(session_id: str, document_id: str | None):
+    """
+    Session-store removal hook. Deletes the document's points from Qdrant
+    once no resume or hybrid session references it any more. Outside an
+    event loop this is a no-op, and `delete_old_sessions` catches up.
+    """
+    if not document_id or document_in_use(document_id):
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    task = loop.create_task(_delete_if_unused(document_id))
+    _releases.add(task)
+    task.add_done_callback(_releases.discard)
+
+# ─── Cleanup Expired Sessions ────────────────────────────────────────────
+async def delete_old_sessions(mins: int = 30):
+    """
+    Deletes the chunks of every document not uploaded in the last `mins`
+    minutes, in one server-side delete over the `created_at` index, except
+    those still referenced by a live session or being ingested.
+
+    Points written before documents were shared have no `document_id` or
+    numeric `created_at`, only a `session_id` and an ISO
+    `metadata.created_at`; a second delete removes those once they expire.
+    No live session can reference them.
+    """
+    if not _USE_QDRANT:
+        return  # local indexes go with their sessions and the LRU cap
+    cutoff = time.time() - mins * 60
+    if DEBUG:
+        print(f"🕒 Removing documents not uploaded in the last {mins} minutes...")
+
+    client = get_async_qdrant_client()
+    expired = Filter(must=[FieldCondition(key="created_at", range=Range(lt=cutoff))])
+    stale, offset = set(), None
+    while True:
+        points, offset = await client.scroll(
+            collection_name=COLLECTION_NAME,
+            scroll_filter=expired,
+            limit=1000,
+            offset=offset,
+            with_payload=["document_id"],
+            with_vectors=False
+        )
+        stale.update(point.payload["document_id"] for point in points)
+        if offset is None:
+            break
+
+    keep = [document_id for document_id in stale if document_id in _inflight or document_in_use(document_id)]
+    if keep:
+        expired.must_not = [FieldCondition(key="document_id", match=MatchAny(any=keep))]
+    await client.delete(collection_name=COLLECTION_NAME, points_selector=expired)
+
+    legacy = Filter(must=[
+        IsEmptyCondition(is_empty=PayloadField(key="document_id")),
+        FieldCondition(
+            key="metadata.created_at",
+            range=DatetimeRange(lt=datetime.fromtimestamp(cutoff, timezone.utc))
+        ),
+    ])
+    await client.delete(collection_name=COLLECTION_NAME, points_selector=legacy)
+
+    deleted = sorted(stale.difference(keep))
+    for document_id in deleted:
+        _document_chunks.pop(document_id, None)
+        _local_indexes.pop(document_id)
+        _evict_query_cache(document_id)
+    if DEBUG:
+        print(f"🗑 {len(deleted)} documents removed, {len(keep)} kept for live sessions.")
@@ -0,0 +1,193 @@
+import hashlib
+import inspect
+import os
+import threading
+from functools import lru_cache, partial
+from importlib.metadata import version
+from pathlib import Path
+from typing import Callable
+
+from langchain.prompts import PromptTemplate
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.runnables import Runnable
+from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+from langchain_google_genai import chat_models as genai_chat_models
+from qdrant_client import AsyncQdrantClient
+from tenacity import retry, stop_after_attempt
+
+from app.config.settings import (
+    GEMINI_MODEL,
+    GEMINI_TEMP,
+    EMBEDDING_MODEL,
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_CAPACITY,
+    EMBED_BATCH_ENABLED,
+    EMBED_BATCH_MAX_SIZE,
+    EMBED_BATCH_MAX_WAIT_MS,
+    VECTOR_DIM,
+    QDRANT_REMOTE_URL,
+    LLM_MAX_CONCURRENCY,
+    LLM_REQUESTS_PER_SECOND,
+    LLM_TOKENS_PER_MINUTE,
+    LLM_OUTPUT_TOKENS_ESTIMATE,
+    EMBEDDING_MAX_CONCURRENCY,
+    EMBEDDING_REQUESTS_PER_SECOND,
+    EMBEDDING_TOKENS_PER_MINUTE,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BASE_SECONDS,
+    LLM_RETRY_MAX_SECONDS,
+    LLM_QUEUE_TIMEOUT_SECONDS,
+    LLM_REQUEST_TIMEOUT_SECONDS,
+)
+from app.utils.embedding_cache import EmbeddingCache, CachedEmbeddings
+from app.utils.embedding_batcher import BatchingEmbeddings
+from app.utils.llm_gateway import LLMGateway, GatewayChatModel, GatewayEmbeddings
+
+# ─── Load API Key ─────────────────────────────────────────────────────────
+gemini_api_key = os.getenv("GEMINI_API_KEY")
+if not gemini_api_key:
+    raise EnvironmentError("Missing GEMINI_API_KEY environment variable.")
+
+# ─── Shared Clients ──────────────────────────────────────────────────────
+# Everything below is built once per process and reused across requests, so
+# HTTP connections stay alive and prompt files are only read from disk once.
+# Per-session data (role, resume, chat history, ...) is passed at invoke time.
+
+@lru_cache(maxsize=None)
+def get_llm_gateway() -> LLMGateway:
+    return LLMGateway(
+        "llm",
+        max_concurrency=LLM_MAX_CONCURRENCY,
+        requests_per_second=LLM_REQUESTS_PER_SECOND,
+        tokens_per_minute=LLM_TOKENS_PER_MINUTE,
+        max_retries=LLM_MAX_RETRIES,
+        retry_base=LLM_RETRY_BASE_SECONDS,
+        retry_max=LLM_RETRY_MAX_SECONDS,
+        queue_timeout=LLM_QUEUE_TIMEOUT_SECONDS
+    )
+
+@lru_cache(maxsize=None)
+def get_embedding_gateway() -> LLMGateway:
+    return LLMGateway(
+        "embeddings",
+        max_concurrency=EMBEDDING_MAX_CONCURRENCY,
+        requests_per_second=EMBEDDING_REQUESTS_PER_SECOND,
+        tokens_per_minute=EMBEDDING_TOKENS_PER_MINUTE,
+        max_retries=LLM_MAX_RETRIES,
+        retry_base=LLM_RETRY_BASE_SECONDS,
+        retry_max=LLM_RETRY_MAX_SECONDS,
+        queue_timeout=LLM_QUEUE_TIMEOUT_SECONDS
+    )
+
+# The gateway must be the only retry layer: a retry inside the client runs
+# while the gateway slot is held, sleeps up to a minute, and its extra calls
+# bypass the rate buckets and priority lanes. `retry=None` on every call
+# turns off the gRPC client's own retry of 503s. langchain-google-genai
+# ignores `max_retries` on chat calls and wraps each one in a fixed
+# two-attempt tenacity retry, which only a patch of its module can turn off.
+_GENAI_RETRY_PATCH_VERSION = "2.1.3"  # the pinned release the patch was checked against
+
+def _disable_genai_chat_retries():
+    installed = version("langchain-google-genai")
+    factory = getattr(genai_chat_models, "_create_retry_decorator", None)
+    if installed != _GENAI_RETRY_PATCH_VERSION or not callable(factory) or inspect.signature(factory).parameters:
+        raise RuntimeError(
+            f"langchain-google-genai {installed} doesn't match the retry patch for "
+            f"{_GENAI_RETRY_PATCH_VERSION}; check how its chat calls retry and update "
+            "_disable_genai_chat_retries in app/chains/registry.py."
+        )
+    genai_chat_models._create_retry_decorator = lambda: retry(reraise=True, stop=stop_after_attempt(1))
+
+@lru_cache(maxsize=None)
+def get_llm(model: str = GEMINI_MODEL, temperature: float = GEMINI_TEMP) -> GatewayChatModel:
+    _disable_genai_chat_retries()
+    llm = ChatGoogleGenerativeAI(
+        model=model,
+        temperature=temperature,
+        google_api_key=gemini_api_key,
+        max_retries=1  # no client-side retries, see above
+    )
+    return GatewayChatModel(
+        model=llm,
+        gateway=get_llm_gateway(),
+        output_tokens=LLM_OUTPUT_TOKENS_ESTIMATE,
+        call_kwargs={"retry": None, "timeout": LLM_REQUEST_TIMEOUT_SECONDS}
+    )
+
+@lru_cache(maxsize=None)
+def get_prompt(path: Path, input_variables: tuple[str, ...]) -> PromptTemplate:
+    return PromptTemplate(
+        input_variables=list(input_variables),
+        template=Path(path).read_text()
+    )
+
+@lru_cache(maxsize=None)
+def prompt_version(path: Path) -> str:
+    """Short hash of a prompt file, for cache keys that must change with the prompt."""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()[:16]
+
+@lru_cache(maxsize=None)
+def get_embedding_cache() -> EmbeddingCache:
+    return EmbeddingCache(EMBEDDING_CACHE_PATH, dim=VECTOR_DIM, capacity=EMBEDDING_CACHE_CAPACITY)
+
+@lru_cache(maxsize=None)
+def get_embedding_batcher(model: str = EMBEDDING_MODEL) -> BatchingEmbeddings:
+    embeddings = GoogleGenerativeAIEmbeddings(
+        model=model,
+        google_api_key=gemini_api_key
+    )
+    gated = GatewayEmbeddings(
+        embeddings,
+        get_embedding_gateway(),
+        embed_queries=partial(embeddings.embed_documents, task_type="RETRIEVAL_QUERY")
+    )
+    return BatchingEmbeddings(
+        gated,
+        max_batch=EMBED_BATCH_MAX_SIZE,
+        max_wait=EMBED_BATCH_MAX_WAIT_MS / 1000,
+        embed_queries=gated.aembed_queries
+    )
+
+@lru_cache(maxsize=None)
+def get_embedding_model(model: str = EMBEDDING_MODEL) -> Embeddings:
+    if EMBED_BATCH_ENABLED:
+        embeddings = get_embedding_batcher(model)
+    else:
+        embeddings = GatewayEmbeddings(
+            GoogleGenerativeAIEmbeddings(model=model, google_api_key=gemini_api_key),
+            get_embedding_gateway()
+        )
+    if not EMBEDDING_CACHE_ENABLED:
+        return embeddings
+    return CachedEmbeddings(embeddings, model, get_embedding_cache())
+
+@lru_cache(maxsize=None)
+def get_async_qdrant_client() -> AsyncQdrantClient:
+    return AsyncQdrantClient(url=QDRANT_REMOTE_URL, prefer_grpc=False, timeout=30.0)
+
+# ─── Compiled Chains ─────────────────────────────────────────────────────
+_chains: dict[tuple[str, str, str, float], Runnable] = {}
+_chains_lock = threading.Lock()
+
+def get_chain(
+    mode: str,
+    name: str,
+    builder: Callable[[BaseChatModel], Runnable],
+    model: str = GEMINI_MODEL,
+    temperature: float = GEMINI_TEMP,
+) -> Runnable:
+    """
+    Returns the chain registered under (mode, name, model, temperature),
+    building it with `builder(llm)` on first use.
+    """
+    key = (mode, name, model, temperature)
+    chain = _chains.get(key)
+    if chain is None:
+        with _chains_lock:
+            chain = _chains.get(key)
+            if chain is None:
+                chain = builder(get_llm(model, temperature))
+                _chains[key] = chain
+    return chain
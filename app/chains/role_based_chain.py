@@ -1,51 +1,28 @@
-import os
-from langchain.prompts import PromptTemplate
-from langchain.chains import ConversationChain, LLMChain
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import Runnable, RunnableLambda
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.memory import ConversationBufferMemory
-from app.config.settings import DEBUG, GEMINI_MODEL, GEMINI_TEMP, ROLE_PROMPT_PATH, ROLE_EVAL_PROMPT_PATH
+from app.chains.registry import get_chain, get_prompt
+from app.config.settings import DEBUG, ROLE_PROMPT_PATH, ROLE_EVAL_PROMPT_PATH
 
-google_api_key = os.getenv("GEMINI_API_KEY")
-if not google_api_key:
-    raise ValueError("GEMINI_API_KEY is missing from environment variables.")
+def print_and_return(prompt):
+    if DEBUG:
+        print("🧾 Final Prompt Sent to LLM:\n", prompt.to_string())
+    return prompt
 
-def get_role_conversation_chain(memory: ConversationBufferMemory, role_name: str) -> ConversationChain:
+def _build_conversation_chain(llm: ChatGoogleGenerativeAI) -> Runnable:
+    prompt = get_prompt(ROLE_PROMPT_PATH, ("role_name", "chat_history", "input"))
+    return prompt | RunnableLambda(print_and_return) | llm | StrOutputParser()
 
-    template_str = ROLE_PROMPT_PATH.read_text()  
-    dynamic_prompt = template_str.replace("{role_name}", role_name)
-
-
-    prompt = PromptTemplate(
-        input_variables=["chat_history", "input"],
-        template=dynamic_prompt
-    )
-
-    llm = ChatGoogleGenerativeAI(
-        model=GEMINI_MODEL,
-        temperature=GEMINI_TEMP,
-        google_api_key=google_api_key
-    )
-
-    return ConversationChain(
-        llm=llm,
-        prompt=prompt,
-        memory=memory,
-        verbose=DEBUG
-    )
-
-def get_evaluation_chain() -> LLMChain:
-
-    template = ROLE_EVAL_PROMPT_PATH.read_text()
-
-    prompt = PromptTemplate(
-        input_variables=["role_name", "chat_history"],
-        template=template
-    )
+def _build_evaluation_chain(llm: ChatGoogleGenerativeAI) -> Runnable:
+    prompt = get_prompt(ROLE_EVAL_PROMPT_PATH, ("role_name", "chat_history"))
+    return prompt | llm
 
-    llm = ChatGoogleGenerativeAI(
-        model=GEMINI_MODEL,
-        temperature=GEMINI_TEMP,
-        google_api_key=google_api_key
-    )
+def get_role_conversation_chain() -> Runnable:
+    """
+    Shared conversation chain for role-based mode.
+    Invoke with `role_name`, `chat_history` and `input`.
+    """
+    return get_chain("role", "conversation", _build_conversation_chain)
 
-    return prompt | llm
+def get_evaluation_chain() -> Runnable:
+    return get_chain("role", "evaluation", _build_evaluation_chain)
@@ -0,0 +1,99 @@
+import asyncio
+from typing import Callable
+
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import Runnable
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from app.chains.registry import get_chain, get_prompt
+from app.memory.rolling_summary import RollingSummaryMemory
+from app.utils.llm_gateway import llm_lane
+from app.config.settings import (
+    DEBUG,
+    SUMMARY_PROMPT_PATH,
+    EVAL_NOTES_PROMPT_PATH,
+    EVAL_MAP_REDUCE_TOKENS,
+    EVAL_SEGMENT_TOKENS
+)
+
+# Shared by all four interview modes: keeps the conversation prompt small
+# while the session still holds the full transcript for evaluation.
+
+# ─── Rolling Summary ─────────────────────────────────────────────────────
+def _build_summary_chain(llm: ChatGoogleGenerativeAI) -> Runnable:
+    prompt = get_prompt(SUMMARY_PROMPT_PATH, ("summary", "new_lines"))
+    return prompt | llm | StrOutputParser()
+
+def get_summary_chain() -> Runnable:
+    return get_chain("memory", "summary", _build_summary_chain, temperature=0.0)
+
+_summarizing: dict[str, asyncio.Task] = {}
+
+async def _summarize(summary: str, new_lines: str, start: int, stop: int, save: Callable[[str, int, int], None]):
+    updated = await get_summary_chain().ainvoke({
+        "summary": summary or "(nothing yet)",
+        "new_lines": new_lines
+    })
+    save(updated.strip(), start, stop)
+    if DEBUG:
+        print(f"📝 Summary now covers {stop} turns.")
+
+def _summarized(key: str, task: asyncio.Task):
+    _summarizing.pop(key, None)
+    if not task.cancelled() and task.exception():
+        print(f"❌ Summary update failed for {key}: {task.exception()}")
+
+def summarize_in_background(key: str, memory: RollingSummaryMemory, save: Callable[[str, int, int], None]):
+    """
+    Folds turns that have left the recent window into the running summary
+    without holding up the reply. `save(summary, start, stop)` writes the
+    result back to the session. Only one update per `key` runs at a time;
+    anything it misses is picked up after the next reply.
+    """
+    start, stop = memory.pending()
+    if stop <= start or key in _summarizing:
+        return
+    with llm_lane("background"):  # the task keeps the lane it was created in
+        task = asyncio.ensure_future(_summarize(
+            memory.summary, memory.formatted(start, stop), start, stop, save
+        ))
+    _summarizing[key] = task
+    task.add_done_callback(lambda t: _summarized(key, t))
+
+# ─── Evaluation Map-Reduce ───────────────────────────────────────────────
+def _build_notes_chain(llm: ChatGoogleGenerativeAI) -> Runnable:
+    prompt = get_prompt(EVAL_NOTES_PROMPT_PATH, ("transcript",))
+    return prompt | llm | StrOutputParser()
+
+def get_notes_chain() -> Runnable:
+    return get_chain("memory", "notes", _build_notes_chain, temperature=0.0)
+
+def _segments(memory: RollingSummaryMemory) -> list[str]:
+    segments, start = [], 0
+    for i in range(1, memory.message_count):
+        if memory.tokens(start, i + 1) > EVAL_SEGMENT_TOKENS:
+            segments.append(memory.formatted(start, i))
+            start = i
+    segments.append(memory.formatted(start))
+    return segments
+
+async def evaluation_history(memory: RollingSummaryMemory) -> str:
+    """
+    Chat history for an evaluation prompt. Transcripts within
+    `EVAL_MAP_REDUCE_TOKENS` are passed verbatim; longer ones are split into
+    segments that are condensed to notes concurrently (map), and the
+    evaluation chain then works from those notes (reduce).
+    """
+    if memory.token_count <= EVAL_MAP_REDUCE_TOKENS:
+        return memory.transcript()
+
+    segments = _segments(memory)
+    if DEBUG:
+        print(f"🧩 Condensing a long transcript in {len(segments)} segments.")
+
+    chain = get_notes_chain()
+    notes = await asyncio.gather(*(chain.ainvoke({"transcript": segment}) for segment in segments))
+    return "\n\n".join(
+        f"Notes on part {i} of {len(notes)} of the interview:\n{note.strip()}"
+        for i, note in enumerate(notes, start=1)
+    )
@@ -7,28 +7,134 @@ GEMINI_TEMP = 0.7
 GEMINI_MODEL = "gemini-2.0-flash"
 SESSION_TIMEOUT_MINUTES = 20
 
+# LLM GATEWAY (shared by every chat and embedding call in the process)
+LLM_MAX_CONCURRENCY = 16  # chat calls in flight; the rest queue by priority lane
+LLM_REQUESTS_PER_SECOND = 10  # None disables the limit
+LLM_TOKENS_PER_MINUTE = 1_000_000  # estimated prompt + reply tokens; None disables the limit
+LLM_OUTPUT_TOKENS_ESTIMATE = 512  # reply tokens charged up front per call
+EMBEDDING_MAX_CONCURRENCY = 8
+EMBEDDING_REQUESTS_PER_SECOND = 25
+EMBEDDING_TOKENS_PER_MINUTE = None
+LLM_MAX_RETRIES = 4  # retries of 429/5xx failures, with jittered exponential backoff
+LLM_RETRY_BASE_SECONDS = 0.5
+LLM_RETRY_MAX_SECONDS = 8
+LLM_QUEUE_TIMEOUT_SECONDS = 30  # longer waits for a slot fail with 503
+LLM_REQUEST_TIMEOUT_SECONDS = 60  # per chat call; a timeout is retried by the gateway
+
+# SESSION STORAGE
+SESSION_BACKEND = "memory"  # "memory" (single worker) or "sqlite" (shared across workers)
+SESSION_DB_PATH = Path("data/sessions.sqlite")
+SESSION_SWEEP_INTERVAL_SECONDS = 60
+
+# RESUME / HYBRID SESSION LIMITS (per mode; least recently used are evicted first)
+RAG_SESSION_TIMEOUT_MINUTES = 60
+RAG_MAX_SESSIONS = 1000
+RAG_SESSION_MAX_BYTES = 64 * 1024 * 1024
+
+# BACKGROUND JOBS
+INGESTION_WORKERS = 2
+EVALUATION_WORKERS = 4
+EVALUATION_CACHE_SIZE = 1000  # finished evaluations kept by transcript hash
+BULK_EVALUATION_CONCURRENCY = 8  # evaluations of one bulk request in flight at a time (upper bound)
+BULK_EVALUATION_MAX_ITEMS = 1000
+JOB_HISTORY_LIMIT = 1000
+JOB_POLL_SECONDS = 1.0  # how often a job run by another worker is re-read from the shared store
+JOB_STALE_SECONDS = 600  # a shared job unfinished for this long is presumed lost with its worker
+
+# CONVERSATION MEMORY
+MEMORY_RECENT_TURNS = 6  # turns kept verbatim; older ones are folded into a summary
+MEMORY_TOKEN_BUDGET = 2500  # approximate tokens for summary + recent turns
+SUMMARY_PROMPT_PATH = Path("app/prompts/summary_prompt.txt")
+EVAL_MAP_REDUCE_TOKENS = 12000  # longer transcripts are condensed segment by segment
+EVAL_SEGMENT_TOKENS = 4000
+EVAL_NOTES_PROMPT_PATH = Path("app/prompts/transcript_notes_prompt.txt")
+
 # ROLE BASED CONFIGS
 ROLE_PROMPT_PATH = Path("app/prompts/role_prompt.txt")
 ROLE_EVAL_PROMPT_PATH = Path("app/prompts/role_evaluation_prompt.txt")
 
+# ROLE QUESTION BANK (built offline with scripts/question_bank.py)
+ROLE_QUESTION_SOURCE = "llm"  # "bank": ask from the role's question bank when there is one, LLM for follow-ups
+QUESTION_BANK_DIR = Path("data/question_bank")
+QUESTION_BANK_TOPICS_PROMPT_PATH = Path("app/prompts/question_bank_topics_prompt.txt")
+QUESTION_BANK_TOPICS = 8  # topics generated per role when none are given
+QUESTION_BANK_LEVELS = ("introductory", "intermediate", "advanced")
+QUESTION_BANK_PER_LEVEL = 2  # questions generated per topic and level
+QUESTION_BANK_TURNS_PER_LEVEL = 3  # turns before moving on to harder questions
+QUESTION_BANK_FOLLOW_UP_EVERY = 3  # one live follow-up after this many bank questions in a row; 0 disables
+QUESTION_BANK_MIN_ANSWER_WORDS = 8  # shorter answers get a live follow-up instead of the next bank question
+QUESTION_BANK_CACHE_SIZE = 256  # banks kept in memory per process
+
 # JOB DESCRIPTION CONFIGS
 JD_PROMPT_PATH = Path("app/prompts/jd_prompt.txt")
 JD_EVAL_PROMPT_PATH = Path("app/prompts/jd_evaluation_prompt.txt")
 
+# OPENING QUESTIONS (first reply of role / JD sessions)
+OPENING_CACHE_ENABLED = True
+OPENING_CACHE_SIZE = 2000  # roles / JDs remembered, least recently used are dropped first
+OPENING_VARIANTS = 4  # replies kept per role / JD, served round-robin
+OPENING_MAX_SERVES = 25  # a reply is retired (and replaced) after opening this many sessions
+OPENING_REFILL_MIN_REQUESTS = 2  # roles / JDs asked for less often only keep their live reply
+OPENING_WARMUP_MAX_TARGETS = 500  # roles + JDs per warm-up request
+OPENING_WARMUP_WORKERS = 1
+
+# PDF UPLOADS
+MAX_PDF_BYTES = 10 * 1024 * 1024
+MAX_PDF_PAGES = 40
+PDF_PARALLEL_MIN_PAGES = 12  # smaller documents are extracted inline
+PDF_WORKERS = 4
+
 # RESUME CONFIGS
 COLLECTION_NAME = "resume_collection"
 EMBEDDING_MODEL = "models/embedding-001"
 CHUNK_SIZE = 600
 CHUNK_OVERLAP = 100
 VECTOR_DIM = 768
+UPSERT_BATCH_SIZE = 64  # chunks embedded and written to Qdrant per batch
+INGEST_PARALLEL_BATCHES = 4  # batches of one document in flight at a time
 SEARCH_TYPE = "mmr"
 K = 5
+FETCH_K = 40
+LAMBDA_MULT = 0.5
+FALLBACK_CONTEXT_CHARS = 2400  # resume head used when no unused chunk is left
 MAX_CHUNK_USAGE = 1
 QDRANT_PATH = Path("qdrant_db")
 RESUME_PROMPT_PATH = Path("app/prompts/resume_prompt.txt")
 RESUME_EVAL_PROMPT_PATH = Path("app/prompts/resume_evaluation_prompt.txt")
 QDRANT_REMOTE_URL = "http://localhost:6333"
 
+# QDRANT COLLECTION (applied on creation, and to an existing collection at startup)
+# The defaults build the same collection as before these settings existed.
+# Quantization, on-disk vectors and HNSW tuning stay off until
+# benchmarks/vector_quantization.py has measured recall and memory against a
+# Qdrant server with production-sized data (see README).
+QDRANT_QUANTIZATION = None  # None, "scalar" (int8, 4x smaller) or "binary" (32x smaller)
+QDRANT_QUANTIZATION_ALWAYS_RAM = True  # keep quantized vectors in RAM even if originals are on disk
+QDRANT_RESCORE = True  # re-rank quantized candidates with the original vectors
+QDRANT_OVERSAMPLING = 2.0  # candidates fetched per result before rescoring
+QDRANT_VECTORS_ON_DISK = False  # memory-map original vectors instead of holding them in RAM
+QDRANT_HNSW_M = None  # graph links per node; None uses Qdrant's default (16)
+QDRANT_HNSW_EF_CONSTRUCT = None  # build-time beam width; None uses Qdrant's default (100)
+QDRANT_HNSW_PAYLOAD_M = None  # per-tenant (document) graph links; None builds none
+QDRANT_HNSW_EF = None  # search-time beam width; None uses Qdrant's default
+
+# EMBEDDING CACHE
+EMBEDDING_CACHE_ENABLED = True
+EMBEDDING_CACHE_PATH = Path("data/embedding_cache")
+EMBEDDING_CACHE_CAPACITY = 50_000  # vectors kept on disk before LRU eviction
+
+# EMBEDDING BATCHING
+EMBED_BATCH_ENABLED = True
+EMBED_BATCH_MAX_SIZE = 100  # texts per provider call (Gemini's batch limit)
+EMBED_BATCH_MAX_WAIT_MS = 5  # how long the first text waits for company
+
+# RETRIEVAL BACKEND
+RETRIEVAL_BACKEND = "qdrant"  # "local": search in-process NumPy indexes instead of Qdrant
+LOCAL_INDEX_MAX_DOCUMENTS = 2000  # per process, least recently used are dropped first
+LOCAL_INDEX_QDRANT_COPY = True  # "local" only: keep Qdrant as the durable copy
+QUERY_CACHE_SIZE = 4096  # cached query vectors, and separately cached search results
+RETRIEVAL_MIN_WORDS = 3  # shorter messages ("yes", "go on") skip retrieval
+
 # HYBRID CONFIGS
 HYBRID_PROMPT_PATH = Path("app/prompts/hybrid_prompt.txt")
 HYBRID_EVAL_PROMPT_PATH = Path("app/prompts/hybrid_evaluation_prompt.txt")
\ No newline at end of file
@@ -1,26 +1,84 @@
 # resume_sessions.py
 
-from typing import Dict
 from uuid import uuid4
+from app.chains.rag import release_document
+from app.config.settings import RAG_SESSION_TIMEOUT_MINUTES, RAG_MAX_SESSIONS, RAG_SESSION_MAX_BYTES
+from app.memory.rolling_summary import RollingSummaryMemory
+from app.memory.store import SessionStore, create_store
 
 class ResumeSession:
-    def __init__(self, resume_text: str):
+    def __init__(self, resume_text: str, document_id: str | None = None):
         self.resume_text = resume_text
-        self.chat_history: list[tuple[str, str]] = []
+        self.document_id = document_id  # fingerprint of resume_text; keys its chunks in Qdrant
+        self.memory = RollingSummaryMemory(human_prefix="User", ai_prefix="AI", separator="\n\n")
         self.chunk_usage: dict[str, int] = {}
+        self.ingest_job_id: str | None = None
 
-_sessions: Dict[str, ResumeSession] = {}
+    def to_dict(self) -> dict:
+        return {
+            "resume_text": self.resume_text,
+            "document_id": self.document_id,
+            "memory": self.memory.to_dict(),
+            "chunk_usage": self.chunk_usage,
+            "ingest_job_id": self.ingest_job_id,
+        }
 
-def create_session(resume_text: str) -> str:
+    def record_chunk_usage(self, chunk_ids: list[str]):
+        for cid in chunk_ids:
+            self.chunk_usage[cid] = self.chunk_usage.get(cid, 0) + 1
+
+    def approx_bytes(self) -> int:
+        """Rough size of the session's text, for the store's byte budget."""
+        return (
+            len(self.resume_text)
+            + self.memory.token_count * 4
+            + len(self.memory.summary)
+            + sum(len(cid) + 8 for cid in self.chunk_usage)
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ResumeSession":
+        session = cls(data["resume_text"], document_id=data["document_id"])
+        session.memory.load(data["memory"])
+        session.chunk_usage = data["chunk_usage"]
+        session.ingest_job_id = data["ingest_job_id"]
+        return session
+
+# Removing a session (reset, expiry or eviction) releases its Qdrant points
+# once no other resume or hybrid session uses the same document.
+_sessions: SessionStore[ResumeSession] = create_store(
+    "resume",
+    ResumeSession.from_dict,
+    ttl_minutes=RAG_SESSION_TIMEOUT_MINUTES,
+    max_sessions=RAG_MAX_SESSIONS,
+    max_bytes=RAG_SESSION_MAX_BYTES,
+    on_remove=release_document
+)
+
+def create_session(resume_text: str, document_id: str | None = None) -> str:
     session_id = str(uuid4())
-    _sessions[session_id] = ResumeSession(resume_text)
+    _sessions.put(session_id, ResumeSession(resume_text, document_id=document_id))
     return session_id
 
 def get_session(session_id: str) -> tuple[str, ResumeSession]:
-    return session_id, _sessions[session_id]
+    session = _sessions.get(session_id)
+    if session is None:
+        raise KeyError(session_id)
+    return session_id, session
+
+def save_session(session_id: str, session: ResumeSession):
+    _sessions.put(session_id, session)
+
+def save_summary(session_id: str, summary: str, start: int, stop: int):
+    session = _sessions.get(session_id)
+    if session is not None and session.memory.apply_summary(summary, start, stop):
+        _sessions.put(session_id, session)
 
 def list_sessions():
-    return [{ "session_id": sid, "messages": len(sess.chat_history)} for sid, sess in _sessions.items()]
+    return [
+        {"session_id": sid, "messages": sess.memory.message_count, "tokens": sess.memory.token_count}
+        for sid, sess in _sessions.items()
+    ]
 
 def reset_session(session_id: str) -> bool:
-    return _sessions.pop(session_id, None) is not None
+    return _sessions.delete(session_id)
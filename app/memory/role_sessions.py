@@ -1,47 +1,86 @@
 from uuid import uuid4
-from datetime import datetime, timedelta
-from langchain.memory import ConversationBufferMemory
+from datetime import datetime
 from app.config.settings import SESSION_TIMEOUT_MINUTES
+from app.memory.rolling_summary import RollingSummaryMemory
+from app.memory.store import SessionStore, create_store
 
 class ChatSession:
     def __init__(self):
-        self.memory = ConversationBufferMemory(memory_key="chat_history")
+        self.memory = RollingSummaryMemory()
         self.role_name: str | None = None
+        self.bank_version: str | None = None  # question bank the indexes below refer to
+        self.bank_asked: list[int] = []
+        self.bank_streak = 0  # bank questions asked since the last live turn
         self.created_at = datetime.utcnow()
         self.last_accessed = datetime.utcnow()
 
-_sessions: dict[str, ChatSession] = {}
+    def to_dict(self) -> dict:
+        return {
+            "role_name": self.role_name,
+            "memory": self.memory.to_dict(),
+            "bank_version": self.bank_version,
+            "bank_asked": self.bank_asked,
+            "bank_streak": self.bank_streak,
+            "created_at": self.created_at.isoformat(),
+            "last_accessed": self.last_accessed.isoformat(),
+        }
 
-def get_session(session_id: str | None) -> tuple[str, ChatSession]:
-    now = datetime.utcnow()
+    @classmethod
+    def from_dict(cls, data: dict) -> "ChatSession":
+        session = cls()
+        session.role_name = data["role_name"]
+        session.memory.load(data["memory"])
+        session.bank_version = data.get("bank_version")
+        session.bank_asked = data.get("bank_asked", [])
+        session.bank_streak = data.get("bank_streak", 0)
+        session.created_at = datetime.fromisoformat(data["created_at"])
+        session.last_accessed = datetime.fromisoformat(data["last_accessed"])
+        return session
 
-    # Step 1: Clean up expired sessions
-    expired_ids = [
-        sid for sid, session in _sessions.items()
-        if now - session.last_accessed > timedelta(minutes=SESSION_TIMEOUT_MINUTES)
-    ]
-    for sid in expired_ids:
-        del _sessions[sid]
+_sessions: SessionStore[ChatSession] = create_store(
+    "role", ChatSession.from_dict, ttl_minutes=SESSION_TIMEOUT_MINUTES
+)
 
-    # Step 2: Create or retrieve session
-    if not session_id or session_id not in _sessions:
+def get_session(session_id: str | None) -> tuple[str, ChatSession]:
+    # Expired sessions are never returned by the store; the background
+    # sweeper deletes them, so only this session is touched here.
+    session = _sessions.get(session_id) if session_id else None
+    if session is None:
         session_id = str(uuid4())
-        _sessions[session_id] = ChatSession()
+        session = ChatSession()
+
+    session.last_accessed = datetime.utcnow()
+    _sessions.put(session_id, session)
 
-    # Step 3: Update last accessed time
-    _sessions[session_id].last_accessed = now
+    return session_id, session
+
+def find_session(session_id: str) -> ChatSession | None:
+    """
+    Looks up an existing session without creating or touching it.
+    """
+    return _sessions.get(session_id)
 
-    return session_id, _sessions[session_id]
+def save_session(session_id: str, session: ChatSession):
+    """
+    Persist changes made to a session obtained from `get_session`.
+    """
+    _sessions.put(session_id, session)
+
+def save_summary(session_id: str, summary: str, start: int, stop: int):
+    """
+    Stores a background summary update, unless the session is gone or its
+    summary has moved on since the update started.
+    """
+    session = _sessions.get(session_id)
+    if session is not None and session.memory.apply_summary(summary, start, stop):
+        _sessions.put(session_id, session)
 
 def reset_session(session_id: str) -> bool:
     """
     Delete session memory for the given session_id.
     Returns True if session existed and was deleted.
     """
-    if session_id in _sessions:
-        del _sessions[session_id]
-        return True
-    return False
+    return _sessions.delete(session_id)
 
 def list_sessions() -> list[dict]:
     """
@@ -49,9 +88,7 @@ def list_sessions() -> list[dict]:
     """
     sessions_summary = []
     for session_id, session in _sessions.items():
-        chat_log = session.memory.load_memory_variables({})
-        chat_history = chat_log.get("chat_history", "")
-        message_count = chat_history.count("Human:")
+        message_count = session.memory.message_count
 
         sessions_summary.append({
             "session_id": session_id,
@@ -0,0 +1,129 @@
+from app.config.settings import MEMORY_RECENT_TURNS, MEMORY_TOKEN_BUDGET
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token), good enough for budgeting."""
+    return len(text) // 4 + 1
+
+class RollingSummaryMemory:
+    """
+    Conversation memory that keeps the full transcript but only puts the
+    last `MEMORY_RECENT_TURNS` turns into the prompt verbatim. Older turns
+    are folded into `summary` by a background summarizer, and the rendered
+    history is kept within `MEMORY_TOKEN_BUDGET` tokens.
+
+    Exposes `load_memory_variables`/`save_context` like LangChain's buffer
+    memory, so it can stand in for `ConversationBufferMemory`.
+
+    Each turn is formatted and its tokens counted once, when it is added;
+    turns must therefore only be appended through `add_turn`.
+    """
+    def __init__(self, human_prefix: str = "Human", ai_prefix: str = "AI", separator: str = "\n"):
+        self.human_prefix = human_prefix
+        self.ai_prefix = ai_prefix
+        self.separator = separator
+        self.turns: list[tuple[str, str]] = []
+        self.summary = ""
+        self.summarized = 0  # leading turns already folded into `summary`
+        self._formatted: list[str] = []
+        self._token_prefix: list[int] = [0]  # _token_prefix[i] = tokens in turns[:i]
+        self._transcript: str | None = None
+
+    def format_turn(self, turn: tuple[str, str]) -> str:
+        message, reply = turn
+        return f"{self.human_prefix}: {message}\n{self.ai_prefix}: {reply}"
+
+    def formatted(self, start: int = 0, stop: int | None = None) -> str:
+        """Turns `[start, stop)` as they appear in a prompt."""
+        return self.separator.join(self._formatted[start:stop])
+
+    def tokens(self, start: int = 0, stop: int | None = None) -> int:
+        stop = len(self.turns) if stop is None else stop
+        return self._token_prefix[stop] - self._token_prefix[start]
+
+    @property
+    def message_count(self) -> int:
+        return len(self.turns)
+
+    @property
+    def token_count(self) -> int:
+        return self._token_prefix[-1]
+
+    # ─── Prompt History ──────────────────────────────────────────────────
+    def render(self) -> str:
+        """
+        Summary of the earlier conversation followed by the most recent
+        turns that fit the token budget. The latest turn is always included.
+        """
+        summary = f"Summary of the earlier conversation:\n{self.summary}" if self.summary else ""
+        used = estimate_tokens(summary) if summary else 0
+
+        start = len(self.turns)
+        while start > self.summarized:
+            cost = self.tokens(start - 1, start)
+            if start < len(self.turns) and used + cost > MEMORY_TOKEN_BUDGET:
+                break
+            used += cost
+            start -= 1
+
+        parts = [summary] if summary else []
+        if start < len(self.turns):
+            parts.append(self.formatted(start))
+        return "\n\n".join(parts)
+
+    def transcript(self) -> str:
+        """The full conversation, for evaluation. Built once per new turn."""
+        if self._transcript is None:
+            self._transcript = self.formatted()
+        return self._transcript
+
+    def load_memory_variables(self, inputs: dict) -> dict:
+        return {"chat_history": self.render()}
+
+    def save_context(self, inputs: dict, outputs: dict):
+        self.add_turn(inputs["input"], outputs["response"])
+
+    def add_turn(self, message: str, reply: str):
+        turn = (message, reply)
+        text = self.format_turn(turn)
+        self.turns.append(turn)
+        self._formatted.append(text)
+        self._token_prefix.append(self._token_prefix[-1] + estimate_tokens(text))
+        self._transcript = None
+
+    # ─── Summarization ───────────────────────────────────────────────────
+    def pending(self) -> tuple[int, int]:
+        """
+        Range `[start, stop)` of turns that should be folded into the
+        summary: everything before the recent window, plus as many of the
+        oldest recent turns as needed for the rest to fit the budget.
+        """
+        start = self.summarized
+        stop = max(start, len(self.turns) - MEMORY_RECENT_TURNS)
+        while stop < len(self.turns) - 1 and self.tokens(stop) > MEMORY_TOKEN_BUDGET * 3 // 4:
+            stop += 1
+        return start, stop
+
+    def apply_summary(self, summary: str, start: int, stop: int) -> bool:
+        """
+        Records a summary covering the first `stop` turns, unless another
+        update already moved the summary past `start` in the meantime.
+        """
+        if self.summarized != start or stop > len(self.turns):
+            return False
+        self.summary = summary
+        self.summarized = stop
+        return True
+
+    def snapshot(self) -> "RollingSummaryMemory":
+        """An independent copy, e.g. for work that runs while the interview continues."""
+        return RollingSummaryMemory(self.human_prefix, self.ai_prefix, self.separator).load(self.to_dict())
+
+    def to_dict(self) -> dict:
+        return {"turns": self.turns, "summary": self.summary, "summarized": self.summarized}
+
+    def load(self, data: dict) -> "RollingSummaryMemory":
+        for message, reply in data["turns"]:
+            self.add_turn(message, reply)
+        self.summary = data["summary"]
+        self.summarized = data["summarized"]
+        return self
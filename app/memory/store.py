@@ -0,0 +1,435 @@
+import asyncio
+import json
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Callable, Generic, Iterator, TypeVar
+
+from app.config.settings import SESSION_BACKEND, SESSION_DB_PATH, SESSION_SWEEP_INTERVAL_SECONDS, DEBUG
+from app.utils.shared_db import connect
+
+S = TypeVar("S")
+
+# Called with (session_id, document_id) whenever a session leaves a store,
+# whether it was reset, expired or evicted to stay within the limits.
+OnRemove = Callable[[str, str | None], None]
+
+def _document_of(session) -> str | None:
+    return getattr(session, "document_id", None)
+
+def _approx_bytes(session) -> int:
+    sizeof = getattr(session, "approx_bytes", None)
+    return sizeof() if sizeof else 0
+
+class SessionStore(ABC, Generic[S]):
+    """
+    Storage backend shared by the session modules. Sessions handed out by
+    `get` must be written back with `put` after they are modified; the
+    in-memory backend returns live objects, so there it is only a no-op.
+
+    With a `ttl` (seconds), a session expires once it hasn't been `put` for
+    that long. `get` never returns an expired session, and `expire` drops
+    them in bulk without looking at live ones. `max_sessions` and
+    `max_bytes` additionally cap the store, evicting the least recently
+    used sessions first.
+    """
+    namespace: str
+    ttl: float | None = None
+    max_sessions: int | None = None
+    max_bytes: int | None = None
+    on_remove: OnRemove | None = None
+
+    def _cutoff(self) -> float:
+        return time.time() - self.ttl
+
+    def _removed(self, removed: list[tuple[str, str | None]]) -> list[str]:
+        if self.on_remove:
+            for session_id, document_id in removed:
+                try:
+                    self.on_remove(session_id, document_id)
+                except Exception as e:
+                    print(f"❌ Session removal hook failed for {session_id}: {e}")
+        return [session_id for session_id, _ in removed]
+
+    @abstractmethod
+    def get(self, session_id: str) -> S | None: ...
+
+    @abstractmethod
+    def put(self, session_id: str, session: S) -> None: ...
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool: ...
+
+    @abstractmethod
+    def items(self) -> Iterator[tuple[str, S]]: ...
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+    @abstractmethod
+    def expire(self) -> list[str]:
+        """
+        Deletes every expired session, then evicts least recently used ones
+        until the store is within its limits. Returns the removed IDs.
+        """
+
+    @abstractmethod
+    def references(self, document_id: str) -> bool:
+        """True if any live session in this store points at `document_id`."""
+
+    @abstractmethod
+    def usage(self) -> dict:
+        """Current size of the store against its limits."""
+
+class InMemorySessionStore(SessionStore[S]):
+    """
+    Per-process dict of live session objects. Fastest, but only usable with a
+    single uvicorn worker.
+
+    Entries are kept in the order they were last `put`, so the expired and
+    least recently used ones are always at the front: `expire` stops at the
+    first live session, and limits are enforced on every `put`. Sizes come
+    from the session's `approx_bytes()`, when it has one.
+    """
+    def __init__(
+        self,
+        namespace: str,
+        ttl: float | None = None,
+        max_sessions: int | None = None,
+        max_bytes: int | None = None,
+        on_remove: OnRemove | None = None
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.on_remove = on_remove
+        self._sessions: OrderedDict[str, tuple[float, S, int]] = OrderedDict()
+        self._bytes = 0
+        self._documents: Counter[str] = Counter()
+
+    def _pop(self, session_id: str) -> tuple[str, str | None]:
+        _, session, size = self._sessions.pop(session_id)
+        self._bytes -= size
+        document_id = _document_of(session)
+        if document_id:
+            self._documents[document_id] -= 1
+            if self._documents[document_id] <= 0:
+                del self._documents[document_id]
+        return session_id, document_id
+
+    def get(self, session_id: str) -> S | None:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        touched, session, _ = entry
+        if self.ttl is not None and touched < self._cutoff():
+            self._removed([self._pop(session_id)])
+            return None
+        return session
+
+    def put(self, session_id: str, session: S) -> None:
+        if session_id in self._sessions:
+            self._pop(session_id)
+        size = _approx_bytes(session) if self.max_bytes is not None else 0
+        self._sessions[session_id] = (time.time(), session, size)
+        self._bytes += size
+        document_id = _document_of(session)
+        if document_id:
+            self._documents[document_id] += 1
+        self._removed(self._evict(keep=session_id))
+
+    def delete(self, session_id: str) -> bool:
+        if session_id not in self._sessions:
+            return False
+        self._removed([self._pop(session_id)])
+        return True
+
+    def items(self) -> Iterator[tuple[str, S]]:
+        cutoff = self._cutoff() if self.ttl is not None else None
+        return iter([
+            (sid, session) for sid, (touched, session, _) in list(self._sessions.items())
+            if cutoff is None or touched >= cutoff
+        ])
+
+    def __len__(self) -> int:
+        return len(self._sessions)  # includes expired sessions not swept yet
+
+    def _over_limits(self) -> bool:
+        return (
+            (self.max_sessions is not None and len(self._sessions) > self.max_sessions)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        )
+
+    def _evict(self, keep: str | None = None) -> list[tuple[str, str | None]]:
+        removed = []
+        cutoff = self._cutoff() if self.ttl is not None else None
+        while self._sessions:
+            session_id, (touched, _, _) = next(iter(self._sessions.items()))
+            expired = cutoff is not None and touched < cutoff
+            if session_id == keep or not (expired or self._over_limits()):
+                break
+            removed.append(self._pop(session_id))
+        return removed
+
+    def expire(self) -> list[str]:
+        return self._removed(self._evict())
+
+    def references(self, document_id: str) -> bool:
+        return self._documents.get(document_id, 0) > 0
+
+    def usage(self) -> dict:
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "approx_bytes": self._bytes if self.max_bytes is not None else None,
+            "max_bytes": self.max_bytes,
+        }
+
+class SQLiteSessionStore(SessionStore[S]):
+    """
+    Sessions shared by every worker process through one SQLite file in WAL
+    mode. Each session is stored as zlib-compressed compact JSON produced by
+    its `to_dict()`, and rebuilt with `loads` on read. Expiry is a range
+    scan over the `updated_at` index; the byte budget counts stored blobs
+    and, like the session cap, is enforced by the sweeper.
+    """
+    def __init__(
+        self,
+        path: Path,
+        namespace: str,
+        loads: Callable[[dict], S],
+        ttl: float | None = None,
+        max_sessions: int | None = None,
+        max_bytes: int | None = None,
+        on_remove: OnRemove | None = None
+    ):
+        self.namespace = namespace
+        self.loads = loads
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.on_remove = on_remove
+        self._lock = threading.Lock()
+
+        self._db = connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "namespace TEXT NOT NULL, session_id TEXT NOT NULL, data BLOB NOT NULL, "
+            "updated_at REAL NOT NULL, document_id TEXT, size INTEGER NOT NULL DEFAULT 0, "
+            "PRIMARY KEY (namespace, session_id))"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(sessions)")}
+        if "document_id" not in columns:
+            self._db.execute("ALTER TABLE sessions ADD COLUMN document_id TEXT")
+        if "size" not in columns:
+            self._db.execute("ALTER TABLE sessions ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions(namespace, updated_at)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS sessions_document_id ON sessions(document_id)"
+        )
+
+    @staticmethod
+    def _encode(session) -> bytes:
+        return zlib.compress(json.dumps(session.to_dict(), separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+    def _decode(self, blob: bytes) -> S:
+        return self.loads(json.loads(zlib.decompress(blob)))
+
+    def get(self, session_id: str) -> S | None:
+        cutoff = self._cutoff() if self.ttl is not None else 0.0
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data FROM sessions WHERE namespace = ? AND session_id = ? AND updated_at >= ?",
+                (self.namespace, session_id, cutoff)
+            ).fetchone()
+        return self._decode(row[0]) if row else None
+
+    def put(self, session_id: str, session: S) -> None:
+        blob = self._encode(session)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sessions (namespace, session_id, data, updated_at, document_id, size) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, session_id, blob, time.time(), _document_of(session), len(blob))
+            )
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT document_id FROM sessions WHERE namespace = ? AND session_id = ?",
+                (self.namespace, session_id)
+            ).fetchone()
+            if row is None:
+                return False
+            self._db.execute(
+                "DELETE FROM sessions WHERE namespace = ? AND session_id = ?",
+                (self.namespace, session_id)
+            )
+        self._removed([(session_id, row[0])])
+        return True
+
+    def items(self) -> Iterator[tuple[str, S]]:
+        cutoff = self._cutoff() if self.ttl is not None else 0.0
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT session_id, data FROM sessions WHERE namespace = ? AND updated_at >= ?",
+                (self.namespace, cutoff)
+            ).fetchall()
+        for session_id, blob in rows:
+            yield session_id, self._decode(blob)
+
+    def __len__(self) -> int:
+        cutoff = self._cutoff() if self.ttl is not None else 0.0
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM sessions WHERE namespace = ? AND updated_at >= ?",
+                (self.namespace, cutoff)
+            ).fetchone()[0]
+
+    def _select_victims(self) -> list[tuple[str, str | None]]:
+        victims = []
+        if self.ttl is not None:
+            victims += self._db.execute(
+                "SELECT session_id, document_id FROM sessions WHERE namespace = ? AND updated_at < ?",
+                (self.namespace, self._cutoff())
+            ).fetchall()
+
+        if self.max_sessions is None and self.max_bytes is None:
+            return victims
+
+        count, total = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM sessions WHERE namespace = ? AND updated_at >= ?",
+            (self.namespace, self._cutoff() if self.ttl is not None else 0.0)
+        ).fetchone()
+        rows = self._db.execute(
+            "SELECT session_id, document_id, size FROM sessions "
+            "WHERE namespace = ? AND updated_at >= ? ORDER BY updated_at",
+            (self.namespace, self._cutoff() if self.ttl is not None else 0.0)
+        )
+        for session_id, document_id, size in rows:
+            over_count = self.max_sessions is not None and count > self.max_sessions
+            over_bytes = self.max_bytes is not None and total > self.max_bytes
+            if not (over_count or over_bytes):
+                break
+            victims.append((session_id, document_id))
+            count -= 1
+            total -= size
+        return victims
+
+    def expire(self) -> list[str]:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                victims = self._select_victims()
+                self._db.executemany(
+                    "DELETE FROM sessions WHERE namespace = ? AND session_id = ?",
+                    [(self.namespace, session_id) for session_id, _ in victims]
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return self._removed(victims)
+
+    def references(self, document_id: str) -> bool:
+        cutoff = self._cutoff() if self.ttl is not None else 0.0
+        with self._lock:
+            return self._db.execute(
+                "SELECT 1 FROM sessions WHERE document_id = ? AND namespace = ? AND updated_at >= ? LIMIT 1",
+                (document_id, self.namespace, cutoff)
+            ).fetchone() is not None
+
+    def usage(self) -> dict:
+        with self._lock:
+            count, total = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM sessions WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+        return {
+            "sessions": count,
+            "max_sessions": self.max_sessions,
+            "approx_bytes": total,
+            "max_bytes": self.max_bytes,
+        }
+
+_stores: list[SessionStore] = []
+
+def create_store(
+    namespace: str,
+    loads: Callable[[dict], S],
+    ttl_minutes: float | None = None,
+    max_sessions: int | None = None,
+    max_bytes: int | None = None,
+    on_remove: OnRemove | None = None
+) -> SessionStore[S]:
+    """
+    Returns the session store configured by `SESSION_BACKEND` ("memory" or
+    "sqlite"). `namespace` keeps the four interview modes apart in a shared
+    backend; `loads` rebuilds a session from its `to_dict()` output. Stores
+    with a `ttl_minutes` or limits are swept by `run_sweeper`.
+    """
+    ttl = ttl_minutes * 60 if ttl_minutes is not None else None
+    options = dict(ttl=ttl, max_sessions=max_sessions, max_bytes=max_bytes, on_remove=on_remove)
+    if SESSION_BACKEND == "memory":
+        store = InMemorySessionStore(namespace, **options)
+    elif SESSION_BACKEND == "sqlite":
+        store = SQLiteSessionStore(SESSION_DB_PATH, namespace, loads, **options)
+    else:
+        raise ValueError(f"Unknown SESSION_BACKEND: {SESSION_BACKEND!r}")
+    _stores.append(store)
+    return store
+
+def document_in_use(document_id: str) -> bool:
+    """
+    True if a live session in any store still points at `document_id`.
+    Resume and hybrid sessions share documents, so both are checked.
+    """
+    return any(store.references(document_id) for store in _stores)
+
+def store_usage() -> dict[str, dict]:
+    return {store.namespace: store.usage() for store in _stores}
+
+# ─── Expiry Sweeper ──────────────────────────────────────────────────────
+def sweep_expired() -> dict[str, int]:
+    """
+    Expires and evicts sessions in every store. Returns the number of
+    sessions removed per namespace.
+    """
+    removed = {}
+    for store in _stores:
+        expired = store.expire()
+        if expired:
+            removed[store.namespace] = len(expired)
+    return removed
+
+_sweeper: asyncio.Task | None = None
+
+async def run_sweeper(interval: float = SESSION_SWEEP_INTERVAL_SECONDS):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed = sweep_expired()
+            if DEBUG and removed:
+                print(f"🧹 Expired sessions: {removed}")
+        except Exception as e:
+            print(f"❌ Session sweep failed: {e}")
+
+def start_sweeper():
+    global _sweeper
+    if _sweeper is None:
+        _sweeper = asyncio.create_task(run_sweeper())
+
+async def stop_sweeper():
+    global _sweeper
+    if _sweeper is not None:
+        _sweeper.cancel()
+        try:
+            await _sweeper
+        except asyncio.CancelledError:
+            pass
+        _sweeper = None
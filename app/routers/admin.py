@@ -0,0 +1,33 @@
+from fastapi import APIRouter, HTTPException
+from app.schemas.admin_schema import OpeningWarmupRequest
+from app.chains.openings import warm_openings, opening_stats
+from app.config.settings import OPENING_CACHE_ENABLED, OPENING_WARMUP_MAX_TARGETS
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+@router.post("/openings/warm")
+async def warm_opening_cache(req: OpeningWarmupRequest):
+    """
+    Fills the opening-question cache for the given roles and job
+    descriptions in the background, so their first turn is served without
+    an LLM call, and keeps them topped up. Returns the job to poll
+    (`/jobs/{job_id}`).
+    """
+    if not OPENING_CACHE_ENABLED:
+        raise HTTPException(409, "The opening-question cache is disabled.")
+    targets = [("role", role.strip()) for role in req.roles if role.strip()]
+    targets += [("jd", jd.strip()) for jd in req.job_descs if jd.strip()]
+    if not targets:
+        raise HTTPException(400, "Provide at least one role or job description.")
+    if len(targets) > OPENING_WARMUP_MAX_TARGETS:
+        raise HTTPException(400, f"At most {OPENING_WARMUP_MAX_TARGETS} roles and job descriptions per request.")
+
+    job = warm_openings(targets)
+    return {"job_id": job.id, "status": job.status, "targets": len(targets)}
+
+@router.get("/openings")
+def get_opening_cache(top: int = 20):
+    """
+    Opening-question cache statistics and its most requested roles / JDs.
+    """
+    return opening_stats(top=max(0, min(top, 100)))
@@ -0,0 +1,103 @@
+import asyncio
+import json
+import traceback
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from app.schemas.evaluation_schema import BulkEvaluationRequest, BulkEvaluationItem
+from app.chains.evaluation import run_evaluation
+from app.chains import role_based_chain, jd_based_chain, resume_based_chain, hybrid_chain
+from app.memory import role_sessions, jd_sessions, resume_sessions, hybrid_sessions
+from app.config.settings import (
+    ROLE_EVAL_PROMPT_PATH,
+    JD_EVAL_PROMPT_PATH,
+    RESUME_EVAL_PROMPT_PATH,
+    HYBRID_EVAL_PROMPT_PATH,
+    BULK_EVALUATION_CONCURRENCY,
+    BULK_EVALUATION_MAX_ITEMS
+)
+from app.utils.logger import logger
+
+router = APIRouter(prefix="/evaluations", tags=["Evaluations"])
+
+# ─── Evaluation Inputs Per Mode ──────────────────────────────────────────
+# Each returns (session, prompt path, chain, inputs) like the mode's own
+# `/evaluate`, raising KeyError for unknown sessions and ValueError for
+# sessions that can't be evaluated yet.
+
+def _role(session_id: str):
+    session = role_sessions.find_session(session_id)
+    if session is None:
+        raise KeyError(session_id)
+    if not session.role_name:
+        raise ValueError("role_name is missing for the session")
+    return session, ROLE_EVAL_PROMPT_PATH, role_based_chain.get_evaluation_chain(), {"role_name": session.role_name}
+
+def _jd(session_id: str):
+    session = jd_sessions.find_session(session_id)
+    if session is None:
+        raise KeyError(session_id)
+    if not session.job_desc:
+        raise ValueError("job_desc is missing for the session")
+    return session, JD_EVAL_PROMPT_PATH, jd_based_chain.get_evaluation_chain(), {"job_desc": session.job_desc}
+
+def _resume(session_id: str):
+    _, session = resume_sessions.get_session(session_id)
+    if not session.resume_text:
+        raise ValueError("Resume text is missing in session.")
+    return session, RESUME_EVAL_PROMPT_PATH, resume_based_chain.get_evaluation_chain(), {"resume": session.resume_text}
+
+def _hybrid(session_id: str):
+    _, session = hybrid_sessions.get_session(session_id)
+    if not session.resume_text:
+        raise ValueError("Resume text is missing in session.")
+    inputs = {"resume": session.resume_text, "jd_or_role": session.jd_or_role}
+    return session, HYBRID_EVAL_PROMPT_PATH, hybrid_chain.get_evaluation_chain(), inputs
+
+_MODES = {"role": _role, "jd": _jd, "resume": _resume, "hybrid": _hybrid}
+
+async def _evaluate_item(index: int, item: BulkEvaluationItem, limit: asyncio.Semaphore) -> dict:
+    line = {"index": index, "mode": item.mode, "session_id": item.session_id}
+    try:
+        session, prompt_path, chain, inputs = _MODES[item.mode](item.session_id)
+    except KeyError:
+        return {**line, "status": "failed", "error": "Session not found."}
+    except ValueError as e:
+        return {**line, "status": "failed", "error": str(e)}
+
+    try:
+        async with limit:
+            result = await run_evaluation(item.mode, prompt_path, chain, inputs, item.session_id, session.memory)
+        return {**line, "status": "succeeded", "feedback": result["feedback"], "cached": result["cached"]}
+    except Exception as e:
+        traceback.print_exc()
+        logger.error(f"[BulkEvaluationError][{item.mode}][sid={item.session_id}]: {e}")
+        return {**line, "status": "failed", "error": f"Evaluation error: {str(e)}"}
+
+@router.post("/bulk")
+async def evaluate_bulk(req: BulkEvaluationRequest):
+    """
+    Evaluates many sessions, across modes, with at most `concurrency`
+    evaluations in flight. Results are streamed as NDJSON in completion
+    order, one line per item (with its `index` in the request), followed by
+    a summary line. A failing item doesn't affect the others.
+    """
+    if len(req.items) > BULK_EVALUATION_MAX_ITEMS:
+        raise HTTPException(400, f"At most {BULK_EVALUATION_MAX_ITEMS} sessions per request.")
+
+    concurrency = max(1, min(req.concurrency or BULK_EVALUATION_CONCURRENCY, BULK_EVALUATION_CONCURRENCY))
+    limit = asyncio.Semaphore(concurrency)
+
+    async def lines():
+        tasks = [asyncio.ensure_future(_evaluate_item(i, item, limit)) for i, item in enumerate(req.items)]
+        counts = {"succeeded": 0, "failed": 0}
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                line = await next_done
+                counts[line["status"]] += 1
+                yield json.dumps(line, ensure_ascii=False) + "\n"
+        finally:
+            for task in tasks:  # client went away: stop the rest
+                task.cancel()
+        yield json.dumps({"done": True, "total": len(tasks), **counts}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
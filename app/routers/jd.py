@@ -1,11 +1,67 @@
+from functools import partial
 from fastapi import APIRouter, HTTPException
 from app.schemas.jd_based_schema import ChatRequest, ChatResponse
-from app.memory.jd_sessions import get_session, list_sessions, reset_session
+from app.memory.jd_sessions import get_session, save_session, save_summary, list_sessions, reset_session
+from app.chains.summary import summarize_in_background
+from app.chains.evaluation import submit_evaluation, evaluation_response
+from app.chains.openings import OPENING_MESSAGE, opening_reply, opening_tokens
 from app.chains.jd_based_chain import get_role_conversation_chain, get_evaluation_chain
+from app.config.settings import JD_EVAL_PROMPT_PATH
 from app.utils.logger import logger
+from app.utils.sse import sse_response
+from app.utils.llm_gateway import LLMUnavailableError
 
 router = APIRouter(prefix="/chat/jd", tags=["JD-Based-Chat"])
 
+def _save_turn(sid: str, session, message: str, bot_reply: str):
+    session.memory.save_context({"input": message}, {"response": bot_reply})
+    save_session(sid, session)
+    summarize_in_background(f"jd:{sid}", session.memory, partial(save_summary, sid))
+
+async def _converse(sid: str, session, message: str) -> str:
+    """
+    Runs one turn through the shared conversation chain and records it in
+    the session's memory once the reply is complete. The opening turn is
+    answered from the opening-question cache when possible.
+    """
+    if message == OPENING_MESSAGE and not session.memory.message_count:
+        bot_reply = await opening_reply("jd", session.job_desc)
+    else:
+        chat_log = session.memory.load_memory_variables({})
+        bot_reply = await get_role_conversation_chain().ainvoke({
+            "job_desc": session.job_desc,
+            "chat_history": chat_log.get("chat_history", ""),
+            "input": message
+        })
+    _save_turn(sid, session, message, bot_reply)
+    return bot_reply
+
+def _stream_converse(sid: str, session, message: str):
+    """
+    Streaming counterpart of `_converse`. The turn is only written to the
+    session's memory after the last token has been sent.
+    """
+    if message == OPENING_MESSAGE and not session.memory.message_count:
+        tokens = opening_tokens("jd", session.job_desc)
+    else:
+        chat_log = session.memory.load_memory_variables({})
+        tokens = get_role_conversation_chain().astream({
+            "job_desc": session.job_desc,
+            "chat_history": chat_log.get("chat_history", ""),
+            "input": message
+        })
+
+    def on_complete(bot_reply: str) -> dict:
+        _save_turn(sid, session, message, bot_reply)
+        return {"session_id": sid, "reply": bot_reply}
+
+    return sse_response(
+        tokens,
+        on_complete,
+        error_detail="Failed to stream JD-based interview.",
+        log_prefix=f"[RoleChatError][sid={sid}][stream]"
+    )
+
 @router.get("/sessions")
 def get_all_sessions():
     """
@@ -29,7 +85,7 @@ def reset_chat_session(session_id: str):
 @router.post("/interview", response_model=ChatResponse)
 async def interview_jd(req: ChatRequest):
     """
-    Stateful jd-based conversation using ConversationBufferMemory.
+    Stateful jd-based conversation using a shared chain and per-session rolling-summary memory.
     The first message should include `job_desc` without `session_id`.
     All following messages should include `session_id` and `message`.
     """
@@ -40,12 +96,12 @@ async def interview_jd(req: ChatRequest):
 
         sid, session = get_session(None)
         session.job_desc = req.job_desc.strip()
+        save_session(sid, session)
 
-        chain = get_role_conversation_chain(session.memory, session.job_desc)
         try:
-            bot_reply = await chain.apredict(
-                input="Hi, I'm ready to begin for my interview."
-            )
+            bot_reply = await _converse(sid, session, OPENING_MESSAGE)
+        except LLMUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"[RoleChatError][sid={sid}][first]: {e}")
             raise HTTPException(500, "Failed to start role-based interview.")
@@ -61,45 +117,55 @@ async def interview_jd(req: ChatRequest):
         if not session.job_desc:
             raise HTTPException(400, "job_desc missing in session.")
 
-        chain = get_role_conversation_chain(session.memory, session.job_desc)
         try:
-            bot_reply = await chain.apredict(
-                input=req.message
-            )
+            bot_reply = await _converse(sid, session, req.message)
+        except LLMUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"[RoleChatError][sid={sid}][continue]: {e}")
             raise HTTPException(500, "Failed to continue role-based interview.")
         
         return ChatResponse(session_id=sid, reply=bot_reply)
     
+@router.post("/interview/stream")
+async def interview_jd_stream(req: ChatRequest):
+    """
+    Same contract as `/interview`, but the reply is streamed as server-sent
+    events: one `token` event per chunk, then a `done` event carrying
+    `session_id` and the full `reply` (or an `error` event on failure).
+    """
+    if not req.session_id:
+        if not req.job_desc:
+            raise HTTPException(400, "Missing job_desc for new conversation.")
+
+        sid, session = get_session(None)
+        session.job_desc = req.job_desc.strip()
+        save_session(sid, session)
+        return _stream_converse(sid, session, OPENING_MESSAGE)
+
+    if not req.message:
+        raise HTTPException(400, "Missing message for continued conversation.")
+
+    sid, session = get_session(req.session_id)
+    if not session.job_desc:
+        raise HTTPException(400, "job_desc missing in session.")
+
+    return _stream_converse(sid, session, req.message)
+
 @router.post("/evaluate")
 async def evaluate_candidate(session_id: str):
     """
-    Evaluates the entire chat session and provides an overall feedback summary.
+    Starts evaluating the entire chat session in the background and returns
+    the job to poll for the feedback (`/jobs/{job_id}`). Unchanged sessions
+    are answered from the evaluation cache right away.
     """
     sid, session = get_session(session_id)
 
     if not session.job_desc:
         raise HTTPException(400, "job_desc is missing for the session")
 
-    chat_log = session.memory.load_memory_variables({})
-    chat_history = chat_log.get("chat_history", "")
-
-    chain = get_evaluation_chain()
-
-    try:
-        result = await chain.ainvoke({
-            "job_desc": session.job_desc,
-            "chat_history": chat_history
-        })
-
-        feedback = result.content if hasattr(result, "content") else str(result)
-
-        return {
-            "session_id": sid,
-            "feedback": feedback
-        }
-    
-    except Exception as e:
-        logger.error(f"[EvaluationError][sid={sid}]: {e}")
-        raise HTTPException(500, "Failed to evaluate session.")
\ No newline at end of file
+    job = submit_evaluation(
+        "jd", JD_EVAL_PROMPT_PATH, get_evaluation_chain(),
+        {"job_desc": session.job_desc}, sid, session.memory
+    )
+    return evaluation_response(sid, job)
\ No newline at end of file
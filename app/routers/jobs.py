@@ -0,0 +1,47 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from app.utils.jobs import get_job, wait_for_job
+from app.utils.shared_db import SHARED
+from app.utils.sse import format_sse, SSE_HEADERS
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+JOB_EVENT_INTERVAL_SECONDS = 15  # keep-alive status events while a job runs
+
+# Without the shared SQLite store a job only exists in the worker that
+# created it, so polling needs a single worker or sticky routing.
+JOB_NOT_FOUND = "Job not found." if SHARED else (
+    "Job not found. Jobs are kept by the worker that created them: run a single "
+    "worker, route clients to the same worker, or set SESSION_BACKEND = \"sqlite\"."
+)
+
+def _find_job(job_id: str):
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=JOB_NOT_FOUND)
+    return job
+
+@router.get("/{job_id}")
+def get_job_status(job_id: str):
+    """
+    Returns the status of a background job (e.g. resume ingestion or an
+    evaluation).
+    """
+    return _find_job(job_id).to_dict()
+
+@router.get("/{job_id}/events")
+async def stream_job_status(job_id: str):
+    """
+    Server-sent events for a background job: a `status` event now and then
+    while it is queued or running, and a `done` event with the finished job.
+    """
+    job = _find_job(job_id)
+
+    async def event_stream():
+        current = job
+        while not current.done.is_set():
+            yield format_sse({"job_id": current.id, "status": current.status}, event="status")
+            current = await wait_for_job(current, JOB_EVENT_INTERVAL_SECONDS)
+        yield format_sse(current.to_dict(), event="done")
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
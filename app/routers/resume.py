@@ -1,17 +1,51 @@
-import os
-import tempfile
 import traceback
+from functools import partial
 from datetime import datetime, timedelta
 from fastapi import APIRouter, UploadFile, File, HTTPException
-from app.utils.pdf_loader import load_pdf
-from app.chains.resume_based_chain import (
-    build_resume_chain, get_evaluation_chain, ingest_documents, delete_old_sessions
+from starlette.concurrency import run_in_threadpool
+from app.utils.pdf_loader import load_pdf_bytes, PdfLimitError
+from app.config.settings import MAX_PDF_BYTES, RESUME_EVAL_PROMPT_PATH
+from app.utils.sse import sse_response
+from app.utils.llm_gateway import LLMUnavailableError
+from app.utils.jobs import ingestion_queue
+from app.chains.resume_based_chain import build_resume_chain, get_evaluation_chain
+from app.chains.rag import ingest_documents, document_fingerprint, delete_old_sessions
+from app.memory.resume_sessions import (
+    create_session, get_session, save_session, save_summary, list_sessions, reset_session
 )
-from app.memory.resume_sessions import create_session, get_session, list_sessions, reset_session
+from app.chains.summary import summarize_in_background
+from app.chains.evaluation import submit_evaluation, evaluation_response
 from app.schemas.resume_based_schema import ChatRequest, ChatResponse
 
 router = APIRouter(prefix="/chat/resume-rag", tags=["Resume-Based"])
 
+def _build_chain_inputs(req: ChatRequest, session) -> dict:
+    is_first_message = session.memory.message_count == 0
+
+    if is_first_message:
+        chat_instruction = (
+            "This is the first message from the candidate. "
+            "Politely acknowledge the message, and then begin the interview by asking a relevant, ask the user to introduce themselves or ask them about their experience. "
+            "Do not be generic."
+        )
+        final_input = f"{req.message}\n\n{chat_instruction}"
+    else:
+        final_input = req.message
+
+    chat_history = session.memory.load_memory_variables({})["chat_history"]
+
+    return {
+        "session": session,
+        "input": final_input,
+        "query": req.message,
+        "used_chunks": [],
+        "chat_history": chat_history
+    }
+
+async def _ingest_in_background(session_id: str, document_id: str, docs) -> dict:
+    chunks = await ingest_documents(document_id, docs)
+    return {"session_id": session_id, "document_id": document_id, "chunks": chunks}
+
 @router.get("/sessions")
 def get_all_sessions():
     return {"active_sessions": list_sessions()}
@@ -22,24 +56,35 @@ async def upload_resume(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail="Only PDF files are supported.")
 
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-            temp_path = temp_file.name
-            temp_file.write(await file.read())
+        if file.size is not None and file.size > MAX_PDF_BYTES:
+            raise PdfLimitError(f"PDF is larger than {MAX_PDF_BYTES // (1024 * 1024)} MB.")
 
-        docs = load_pdf(temp_path)
-        os.remove(temp_path)
+        docs = await run_in_threadpool(load_pdf_bytes, await file.read())
 
-        resume_text = docs[0].page_content
-        session_id = create_session(resume_text=resume_text)
+        resume_text = "\n".join(doc.page_content for doc in docs)
+        if not resume_text.strip():
+            raise HTTPException(status_code=400, detail="No extractable text found in the PDF.")
 
-        ingest_documents(session_id, docs)
+        document_id = document_fingerprint(resume_text)
+        session_id = create_session(resume_text=resume_text, document_id=document_id)
+        _, session = get_session(session_id)
+
+        job = ingestion_queue.submit("ingest", lambda: _ingest_in_background(session_id, document_id, docs))
+        session.ingest_job_id = job.id
+        save_session(session_id, session)
 
         return {
             "status": "success",
             "session_id": session_id,
-            "message": "Resume uploaded and session created."
+            "job_id": job.id,
+            "document_id": document_id,
+            "message": "Resume uploaded and session created. Indexing continues in the background."
         }
 
+    except HTTPException:
+        raise
+    except PdfLimitError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Resume upload failed: {str(e)}")
@@ -55,82 +100,94 @@ async def resume_interview(req: ChatRequest):
         except KeyError:
             raise HTTPException(status_code=404, detail="Session not found.")
 
-        resume_chain = build_resume_chain(req.session_id)
-
-        is_first_message = len(session.chat_history) == 0
-
-        if is_first_message:
-            chat_instruction = (
-                "This is the first message from the candidate. "
-                "Politely acknowledge the message, and then begin the interview by asking a relevant, ask the user to introduce themselves or ask them about their experience. "
-                "Do not be generic."
-            )
-            final_input = f"{req.message}\n\n{chat_instruction}"
-        else:
-            final_input = req.message
-
-        chat_lines = [f"User: {q}\nAI: {a}" for q, a in session.chat_history]
-        chat_history = "\n\n".join(chat_lines)
-
-        response = resume_chain.invoke({
-            "input": final_input,
-            "chat_history": chat_history
-             })
+        inputs = _build_chain_inputs(req, session)
+        response = await build_resume_chain().ainvoke(inputs)
         
         reply = response if isinstance(response, str) else response.get("answer", str(response))
 
         print("Reply:", reply)
 
-        session.chat_history.append((req.message, reply))
+        session.memory.add_turn(req.message, reply)
+        session.record_chunk_usage(inputs["used_chunks"])
+        save_session(req.session_id, session)
+        summarize_in_background(f"resume:{req.session_id}", session.memory, partial(save_summary, req.session_id))
         return ChatResponse(session_id=req.session_id, reply=reply)
 
+    except (HTTPException, LLMUnavailableError):
+        raise
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Resume chat error: {str(e)}")
 
-@router.post("/evaluate")
-async def evaluate_candidate(session_id: str):
-    try:
-        try:
-            _, session = get_session(session_id)
-        except KeyError:
-            raise HTTPException(status_code=404, detail="Session not found.")
-
-        if not session.resume_text:
-            raise HTTPException(400, "Resume text is missing in session.")
+@router.post("/interview/stream")
+async def resume_interview_stream(req: ChatRequest):
+    """
+    Streams the interviewer's reply as server-sent events (`token` events,
+    then `done` with the full reply). The turn is appended to the session's
+    chat history only once the stream has completed.
+    """
+    if not req.session_id or not req.message:
+        raise HTTPException(status_code=400, detail="Missing session_id or message.")
 
-        chat_lines = [f"User: {q}\nAI: {a}" for q, a in session.chat_history]
-        chat_history = "\n\n".join(chat_lines)
+    try:
+        _, session = get_session(req.session_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Session not found.")
 
-        chain = get_evaluation_chain()
+    inputs = _build_chain_inputs(req, session)
+    tokens = build_resume_chain().astream(inputs)
 
-        result = await chain.ainvoke({
-            "resume": session.resume_text,
-            "chat_history": chat_history
-        })
+    def on_complete(reply: str) -> dict:
+        print("Reply:", reply)
+        session.memory.add_turn(req.message, reply)
+        session.record_chunk_usage(inputs["used_chunks"])
+        save_session(req.session_id, session)
+        summarize_in_background(f"resume:{req.session_id}", session.memory, partial(save_summary, req.session_id))
+        return {"session_id": req.session_id, "reply": reply}
+
+    return sse_response(
+        tokens,
+        on_complete,
+        error_detail="Resume chat error",
+        log_prefix=f"[ResumeChatError][sid={req.session_id}][stream]"
+    )
 
-        feedback = result.content if hasattr(result, "content") else str(result)
+@router.post("/evaluate")
+async def evaluate_candidate(session_id: str):
+    """
+    Starts evaluating the session in the background and returns the job to
+    poll for the feedback (`/jobs/{job_id}`). Unchanged sessions are
+    answered from the evaluation cache right away.
+    """
+    try:
+        _, session = get_session(session_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Session not found.")
 
-        return {
-            "session_id": session_id,
-            "feedback": feedback
-        }
+    if not session.resume_text:
+        raise HTTPException(400, "Resume text is missing in session.")
 
+    try:
+        job = submit_evaluation(
+            "resume", RESUME_EVAL_PROMPT_PATH, get_evaluation_chain(),
+            {"resume": session.resume_text}, session_id, session.memory
+        )
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Evaluation error: {str(e)}")
+    return evaluation_response(session_id, job)
 
 @router.post("/reset")
-def reset_resume_session(session_id: str):
+async def reset_resume_session(session_id: str):
     if reset_session(session_id):
         return {"status": "success", "message": f"Session {session_id} deleted."}
     else:
         raise HTTPException(status_code=404, detail="Session ID not found.")
 
 @router.post("/cleanup-old-sessions")
-def cleanup_old_sessions(mins: int = 30):
+async def cleanup_old_sessions(mins: int = 30):
     try:
-        delete_old_sessions(mins=mins)
+        await delete_old_sessions(mins=mins)
         return {"status": "success", "message": f"Sessions older than {mins} mins cleaned up."}
     except Exception as e:
         traceback.print_exc()
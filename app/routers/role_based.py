@@ -1,11 +1,77 @@
+from functools import partial
 from fastapi import APIRouter, HTTPException
 from app.schemas.role_based_schema import ChatRequest, ChatResponse
-from app.memory.role_sessions import get_session, list_sessions, reset_session
+from app.memory.role_sessions import get_session, save_session, save_summary, list_sessions, reset_session
+from app.chains.summary import summarize_in_background
+from app.chains.evaluation import submit_evaluation, evaluation_response
+from app.chains.openings import OPENING_MESSAGE, opening_reply, opening_tokens
+from app.chains.question_bank import BankPick, next_bank_question, record_bank_turn
 from app.chains.role_based_chain import get_role_conversation_chain, get_evaluation_chain
+from app.config.settings import ROLE_EVAL_PROMPT_PATH, ROLE_QUESTION_SOURCE
 from app.utils.logger import logger
+from app.utils.sse import sse_response, single_chunk
+from app.utils.llm_gateway import LLMUnavailableError
 
 router = APIRouter(prefix="/chat/role", tags=["Role-Based-Chat"])
 
+def _save_turn(sid: str, session, message: str, bot_reply: str, banked: BankPick | None = None):
+    if ROLE_QUESTION_SOURCE == "bank":
+        record_bank_turn(session, banked)
+    session.memory.save_context({"input": message}, {"response": bot_reply})
+    save_session(sid, session)
+    summarize_in_background(f"role:{sid}", session.memory, partial(save_summary, sid))
+
+async def _converse(sid: str, session, message: str) -> str:
+    """
+    Runs one turn through the shared conversation chain and records it in
+    the session's memory once the reply is complete. The opening turn is
+    answered from the opening-question cache when possible, and with
+    ROLE_QUESTION_SOURCE = "bank" later turns from the role's question bank.
+    """
+    banked = None
+    if message == OPENING_MESSAGE and not session.memory.message_count:
+        bot_reply = await opening_reply("role", session.role_name)
+    elif ROLE_QUESTION_SOURCE == "bank" and (banked := next_bank_question(sid, session, message)) is not None:
+        bot_reply = banked.text
+    else:
+        chat_log = session.memory.load_memory_variables({})
+        bot_reply = await get_role_conversation_chain().ainvoke({
+            "role_name": session.role_name,
+            "chat_history": chat_log.get("chat_history", ""),
+            "input": message
+        })
+    _save_turn(sid, session, message, bot_reply, banked)
+    return bot_reply
+
+def _stream_converse(sid: str, session, message: str):
+    """
+    Streaming counterpart of `_converse`. The turn is only written to the
+    session's memory after the last token has been sent.
+    """
+    banked = None
+    if message == OPENING_MESSAGE and not session.memory.message_count:
+        tokens = opening_tokens("role", session.role_name)
+    elif ROLE_QUESTION_SOURCE == "bank" and (banked := next_bank_question(sid, session, message)) is not None:
+        tokens = single_chunk(banked.text)
+    else:
+        chat_log = session.memory.load_memory_variables({})
+        tokens = get_role_conversation_chain().astream({
+            "role_name": session.role_name,
+            "chat_history": chat_log.get("chat_history", ""),
+            "input": message
+        })
+
+    def on_complete(bot_reply: str) -> dict:
+        _save_turn(sid, session, message, bot_reply, banked)
+        return {"session_id": sid, "reply": bot_reply}
+
+    return sse_response(
+        tokens,
+        on_complete,
+        error_detail="Failed to stream role-based interview.",
+        log_prefix=f"[RoleChatError][sid={sid}][stream]"
+    )
+
 @router.get("/sessions")
 def get_all_sessions():
     """
@@ -29,7 +95,7 @@ def reset_chat_session(session_id: str):
 @router.post("/interview", response_model=ChatResponse)
 async def interview_role(req: ChatRequest):
     """
-    Stateful role-based conversation using ConversationBufferMemory.
+    Stateful role-based conversation using a shared chain and per-session rolling-summary memory.
     The first message should include `role_name` without `session_id`.
     All following messages should include `session_id` and `message`.
     """
@@ -40,12 +106,12 @@ async def interview_role(req: ChatRequest):
 
         sid, session = get_session(None)
         session.role_name = req.role_name.strip()
+        save_session(sid, session)
 
-        chain = get_role_conversation_chain(session.memory, session.role_name)
         try:
-            bot_reply = await chain.apredict(
-                input="Hi, I'm ready to begin for my interview."
-            )
+            bot_reply = await _converse(sid, session, OPENING_MESSAGE)
+        except LLMUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"[RoleChatError][sid={sid}][first]: {e}")
             raise HTTPException(500, "Failed to start role-based interview.")
@@ -61,45 +127,55 @@ async def interview_role(req: ChatRequest):
         if not session.role_name:
             raise HTTPException(400, "role_name missing in session.")
 
-        chain = get_role_conversation_chain(session.memory, session.role_name)
         try:
-            bot_reply = await chain.apredict(
-                input=req.message
-            )
+            bot_reply = await _converse(sid, session, req.message)
+        except LLMUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"[RoleChatError][sid={sid}][continue]: {e}")
             raise HTTPException(500, "Failed to continue role-based interview.")
         
         return ChatResponse(session_id=sid, reply=bot_reply)
     
+@router.post("/interview/stream")
+async def interview_role_stream(req: ChatRequest):
+    """
+    Same contract as `/interview`, but the reply is streamed as server-sent
+    events: one `token` event per chunk, then a `done` event carrying
+    `session_id` and the full `reply` (or an `error` event on failure).
+    """
+    if not req.session_id:
+        if not req.role_name:
+            raise HTTPException(400, "Missing role_name for new conversation.")
+
+        sid, session = get_session(None)
+        session.role_name = req.role_name.strip()
+        save_session(sid, session)
+        return _stream_converse(sid, session, OPENING_MESSAGE)
+
+    if not req.message:
+        raise HTTPException(400, "Missing message for continued conversation.")
+
+    sid, session = get_session(req.session_id)
+    if not session.role_name:
+        raise HTTPException(400, "role_name missing in session.")
+
+    return _stream_converse(sid, session, req.message)
+
 @router.post("/evaluate")
 async def evaluate_candidate(session_id: str):
     """
-    Evaluates the entire chat session and provides an overall feedback summary.
+    Starts evaluating the entire chat session in the background and returns
+    the job to poll for the feedback (`/jobs/{job_id}`). Unchanged sessions
+    are answered from the evaluation cache right away.
     """
     sid, session = get_session(session_id)
 
     if not session.role_name:
         raise HTTPException(400, "role_name is missing for the session")
 
-    chat_log = session.memory.load_memory_variables({})
-    chat_history = chat_log.get("chat_history", "")
-
-    chain = get_evaluation_chain()
-
-    try:
-        result = await chain.ainvoke({
-            "role_name": session.role_name,
-            "chat_history": chat_history
-        })
-
-        feedback = result.content if hasattr(result, "content") else str(result)
-
-        return {
-            "session_id": sid,
-            "feedback": feedback
-        }
-    
-    except Exception as e:
-        logger.error(f"[EvaluationError][sid={sid}]: {e}")
-        raise HTTPException(500, "Failed to evaluate session.")
\ No newline at end of file
+    job = submit_evaluation(
+        "role", ROLE_EVAL_PROMPT_PATH, get_evaluation_chain(),
+        {"role_name": session.role_name}, sid, session.memory
+    )
+    return evaluation_response(sid, job)
\ No newline at end of file
@@ -1,5 +1,11 @@
 from fastapi import APIRouter
 from app.utils.logger import logger
+from app.chains.registry import get_embedding_cache, get_embedding_batcher, get_llm_gateway, get_embedding_gateway
+from app.config.settings import EMBEDDING_CACHE_ENABLED, EMBED_BATCH_ENABLED
+from app.memory.store import store_usage
+from app.chains.rag import local_index_stats, query_cache_stats
+from app.chains.openings import opening_stats
+from app.chains.question_bank import question_bank_stats
 
 router = APIRouter(tags=["Live-Check"])
 
@@ -7,3 +13,16 @@ router = APIRouter(tags=["Live-Check"])
 async def status_check():
     logger.info("Live status requested.")
     return {"message": "🤖 AI Interviewer is up and running!"}
+
+@router.get("/metrics", summary="Metrics", description="Returns in-process cache and queue statistics.")
+def metrics():
+    return {
+        "embedding_cache": get_embedding_cache().stats() if EMBEDDING_CACHE_ENABLED else None,
+        "embedding_batches": get_embedding_batcher().stats() if EMBED_BATCH_ENABLED else None,
+        "sessions": store_usage(),
+        "local_index": local_index_stats(),
+        "query_cache": query_cache_stats(),
+        "openings": opening_stats(),
+        "question_bank": question_bank_stats(),
+        "llm_gateway": {"llm": get_llm_gateway().stats(), "embeddings": get_embedding_gateway().stats()},
+    }
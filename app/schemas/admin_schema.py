@@ -0,0 +1,5 @@
+from pydantic import BaseModel
+
+class OpeningWarmupRequest(BaseModel):
+    roles: list[str] = []
+    job_descs: list[str] = []
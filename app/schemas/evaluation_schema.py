@@ -0,0 +1,10 @@
+from typing import Literal
+from pydantic import BaseModel
+
+class BulkEvaluationItem(BaseModel):
+    mode: Literal["role", "jd", "resume", "hybrid"]
+    session_id: str
+
+class BulkEvaluationRequest(BaseModel):
+    items: list[BulkEvaluationItem]
+    concurrency: int | None = None  # capped at BULK_EVALUATION_CONCURRENCY
@@ -0,0 +1,124 @@
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from langchain_core.embeddings import Embeddings
+
+from app.utils.metrics import Histogram
+
+class _Lane:
+    """
+    Pending texts of one kind (queries or documents). The first text starts
+    a `max_wait` timer; the lane is flushed when it fires or as soon as
+    `max_batch` texts are waiting, whichever comes first.
+    """
+    def __init__(self, embed: Callable[[list[str]], Awaitable[list[list[float]]]], max_batch: int, max_wait: float):
+        self.embed = embed
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.requests = 0
+        self.batch_sizes = Histogram((1, 2, 4, 8, 16, 32, 64, 100, 250))
+        self.wait_ms = Histogram((0.5, 1, 2, 5, 10, 20, 50, 100))
+        self._pending: list[tuple[list[str], asyncio.Future, float]] = []
+        self._size = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._sends: set[asyncio.Task] = set()
+
+    async def submit(self, texts: list[str]) -> list[list[float]]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((texts, future, time.perf_counter()))
+        self._size += len(texts)
+        self.requests += 1
+        if self._size >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending, self._size = self._pending, [], 0
+        if pending:
+            task = asyncio.ensure_future(self._send(pending))
+            self._sends.add(task)
+            task.add_done_callback(self._sends.discard)
+
+    async def _send(self, pending: list[tuple[list[str], asyncio.Future, float]]):
+        now = time.perf_counter()
+        for _, _, queued_at in pending:
+            self.wait_ms.observe((now - queued_at) * 1000)
+
+        # Identical texts (e.g. the same question asked in two sessions) are
+        # embedded once and fanned out to every request that asked for them.
+        unique = list(dict.fromkeys(text for texts, _, _ in pending for text in texts))
+        batches = [unique[i:i + self.max_batch] for i in range(0, len(unique), self.max_batch)]
+        for batch in batches:
+            self.batch_sizes.observe(len(batch))
+
+        try:
+            results = await asyncio.gather(*(self.embed(batch) for batch in batches))
+        except Exception as e:
+            for _, future, _ in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        vectors = dict(zip(unique, (vector for result in results for vector in result)))
+        for texts, future, _ in pending:
+            if not future.done():  # the caller may have been cancelled meanwhile
+                future.set_result([vectors[text] for text in texts])
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "pending": self._size,
+            "batch_size": self.batch_sizes.to_dict(),
+            "wait_ms": self.wait_ms.to_dict(),
+        }
+
+class BatchingEmbeddings(Embeddings):
+    """
+    Coalesces concurrent async embedding calls into batched provider calls.
+    Requests arriving within `max_wait` seconds of each other (or until
+    `max_batch` texts are waiting) share one request; each caller gets its
+    own vectors back. Queries and documents are batched separately since
+    providers embed them for different tasks.
+
+    `embed_queries` embeds a batch of queries in one call; without it,
+    queries in a batch are embedded concurrently one by one. Sync calls are
+    passed straight through.
+    """
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        max_batch: int,
+        max_wait: float,
+        embed_queries: Callable[[list[str]], Awaitable[list[list[float]]]] | None = None
+    ):
+        self.embeddings = embeddings
+        self._embed_queries = embed_queries
+        self._queries = _Lane(self._query_batch, max_batch, max_wait)
+        self._documents = _Lane(embeddings.aembed_documents, max_batch, max_wait)
+
+    async def _query_batch(self, texts: list[str]) -> list[list[float]]:
+        if self._embed_queries is not None:
+            return await self._embed_queries(texts)
+        return list(await asyncio.gather(*(self.embeddings.aembed_query(text) for text in texts)))
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await self._documents.submit(texts) if texts else []
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embeddings.embed_query(text)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return (await self._queries.submit([text]))[0]
+
+    def stats(self) -> dict:
+        return {"queries": self._queries.stats(), "documents": self._documents.stats()}
@@ -0,0 +1,220 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from starlette.concurrency import run_in_threadpool
+
+_SQL_BATCH = 500  # stay well below SQLite's bound-parameter limit
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed store of embedding vectors.
+
+    Keys are sha256(model, text). The SQLite file maps each key to a row
+    ("slot") of a fixed-size float32 matrix memory-mapped from disk, and keeps
+    a last-used timestamp per key for LRU eviction once all slots are taken.
+
+    Safe to share between threads and between worker processes. Evicting a
+    key reuses its slot before the SQLite change is committed, so another
+    process may still map the old key to that slot for a moment. Each slot
+    therefore also records the key that owns it, and readers only accept a
+    vector if the owner matches their key both before and after they read it.
+    """
+    def __init__(self, path: Path, dim: int, capacity: int):
+        self.dim = dim
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        vectors_path = path / "vectors.f32"
+        owners_path = path / "owners.bin"
+        index_path = path / "index.sqlite"
+
+        expected_size = capacity * dim * np.dtype(np.float32).itemsize
+        if vectors_path.exists() and (
+            vectors_path.stat().st_size != expected_size or not owners_path.exists()
+        ):
+            # Capacity or dimension changed (or a cache from before slot owners
+            # were recorded): the old matrix can't be reused.
+            vectors_path.unlink()
+            owners_path.unlink(missing_ok=True)
+            index_path.unlink(missing_ok=True)
+
+        self._vectors = np.memmap(
+            vectors_path,
+            dtype=np.float32,
+            mode="r+" if vectors_path.exists() else "w+",
+            shape=(capacity, dim)
+        )
+        self._owners = np.memmap(  # sha256 digest of the key stored in each slot
+            owners_path,
+            dtype=np.uint8,
+            mode="r+" if owners_path.exists() else "w+",
+            shape=(capacity, 32)
+        )
+
+        self._db = sqlite3.connect(index_path, timeout=30.0, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, slot INTEGER NOT NULL UNIQUE, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings(last_used)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._db.execute("INSERT OR IGNORE INTO meta VALUES ('next_slot', 0)")
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, np.ndarray]:
+        keys = list(dict.fromkeys(keys))
+        found: dict[str, np.ndarray] = {}
+        with self._lock:
+            for batch in _batches(keys):
+                placeholders = ",".join("?" * len(batch))
+                rows = self._db.execute(
+                    f"SELECT key, slot FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, slot in rows:
+                    owner = bytes.fromhex(key)
+                    if self._owners[slot].tobytes() != owner:
+                        continue  # slot is being reused by another process
+                    vector = np.array(self._vectors[slot])
+                    if self._owners[slot].tobytes() == owner:
+                        found[key] = vector
+
+            if found:
+                now = time.time()
+                self._db.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: dict[str, list[float]]):
+        items = {k: v for k, v in items.items() if len(v) == self.dim}
+        if not items:
+            return
+
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                for batch in _batches(list(items)):
+                    placeholders = ",".join("?" * len(batch))
+                    for (key,) in self._db.execute(
+                        f"SELECT key FROM embeddings WHERE key IN ({placeholders})", batch
+                    ):
+                        items.pop(key, None)
+
+                new_keys = list(items)[-self.capacity:]
+                slots = self._allocate_slots(len(new_keys))
+
+                # Vectors are written before the rows are committed, so other
+                # readers never see a key whose slot isn't filled in yet. A
+                # reclaimed slot is still mapped to its evicted key until the
+                # commit: its owner is cleared while the vector is replaced,
+                # so readers of the old key treat it as a miss.
+                for key, slot in zip(new_keys, slots):
+                    self._owners[slot] = 0
+                    self._vectors[slot] = np.asarray(items[key], dtype=np.float32)
+                    self._owners[slot] = np.frombuffer(bytes.fromhex(key), dtype=np.uint8)
+                self._vectors.flush()
+                self._owners.flush()
+
+                now = time.time()
+                self._db.executemany(
+                    "INSERT INTO embeddings (key, slot, last_used) VALUES (?, ?, ?)",
+                    [(key, slot, now) for key, slot in zip(new_keys, slots)]
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def _allocate_slots(self, count: int) -> list[int]:
+        next_slot = self._db.execute("SELECT value FROM meta WHERE name = 'next_slot'").fetchone()[0]
+        fresh = list(range(next_slot, min(self.capacity, next_slot + count)))
+        if fresh:
+            self._db.execute("UPDATE meta SET value = ? WHERE name = 'next_slot'", (next_slot + len(fresh),))
+
+        reclaim = count - len(fresh)
+        if reclaim <= 0:
+            return fresh
+
+        evicted = self._db.execute(
+            "SELECT key, slot FROM embeddings ORDER BY last_used LIMIT ?", (reclaim,)
+        ).fetchall()
+        self._db.executemany("DELETE FROM embeddings WHERE key = ?", [(key,) for key, _ in evicted])
+        self.evictions += len(evicted)
+        return fresh + [slot for _, slot in evicted]
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+def _batches(keys: list[str]) -> Iterable[list[str]]:
+    for i in range(0, len(keys), _SQL_BATCH):
+        yield keys[i:i + _SQL_BATCH]
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an embedding model so `embed_documents` only sends cache misses to
+    the provider. Query embeddings are passed straight through.
+    """
+    def __init__(self, embeddings: Embeddings, model_name: str, cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = cache
+
+    def _split(self, texts: list[str]) -> tuple[list[str], dict[str, np.ndarray], list[str]]:
+        keys = [self.cache.key(self.model_name, text) for text in texts]
+        cached = self.cache.get_many(keys)
+        missing = list(dict.fromkeys(text for key, text in zip(keys, texts) if key not in cached))
+        return keys, cached, missing
+
+    def _merge(self, keys, cached, missing, vectors) -> list[list[float]]:
+        fresh = {self.cache.key(self.model_name, text): vector for text, vector in zip(missing, vectors)}
+        if fresh:
+            self.cache.put_many(dict(fresh))
+        return [
+            fresh[key] if key in fresh else cached[key].tolist()
+            for key in keys
+        ]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys, cached, missing = self._split(texts)
+        vectors = self.embeddings.embed_documents(missing) if missing else []
+        return self._merge(keys, cached, missing, vectors)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys, cached, missing = await run_in_threadpool(self._split, texts)
+        vectors = await self.embeddings.aembed_documents(missing) if missing else []
+        return await run_in_threadpool(self._merge, keys, cached, missing, vectors)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embeddings.embed_query(text)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return await self.embeddings.aembed_query(text)
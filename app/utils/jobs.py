@@ -0,0 +1,272 @@
+import asyncio
+import json
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable
+from uuid import uuid4
+
+from app.config.settings import (
+    INGESTION_WORKERS,
+    EVALUATION_WORKERS,
+    OPENING_WARMUP_WORKERS,
+    JOB_HISTORY_LIMIT,
+    JOB_POLL_SECONDS,
+    JOB_STALE_SECONDS
+)
+from app.utils.logger import logger
+from app.utils.shared_db import SHARED, connect
+
+_FINISHED = ("succeeded", "failed")
+
+class Job:
+    def __init__(self, kind: str, func: Callable[[], Awaitable[Any]] | None, key: str | None = None):
+        self.id = str(uuid4())
+        self.kind = kind
+        self.func = func
+        self.key = key  # identifies the work, so the same job isn't queued twice
+        self.status = "queued"  # queued → running → succeeded | failed
+        self.result: Any = None
+        self.error: str | None = None
+        self.created_at = datetime.utcnow()
+        self.started_at: datetime | None = None
+        self.finished_at: datetime | None = None
+        self.done = asyncio.Event()
+        self.remote = False  # a snapshot of a job run by another worker
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, key: str | None = None) -> "Job":
+        job = cls(data["kind"], None, key)
+        job.id = data["job_id"]
+        job.status = data["status"]
+        job.result = data["result"]
+        job.error = data["error"]
+        job.created_at = datetime.fromisoformat(data["created_at"])
+        job.started_at = datetime.fromisoformat(data["started_at"]) if data["started_at"] else None
+        job.finished_at = datetime.fromisoformat(data["finished_at"]) if data["finished_at"] else None
+        job.remote = True
+        if job.status in _FINISHED:
+            job.done.set()
+        return job
+
+class _JobTable:
+    """
+    Every worker's jobs in the shared SQLite file, written on each status
+    change, so a job can be polled on any worker and the same work isn't
+    queued by two of them.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._db = connect()
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, key TEXT, status TEXT NOT NULL, "
+            "created REAL NOT NULL, data TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_key ON jobs(key, status)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_created ON jobs(status, created)")
+
+    def save(self, job: Job):
+        data = json.dumps(job.to_dict(), ensure_ascii=False)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, key, status, created, data) VALUES (?, ?, ?, ?, ?)",
+                (job.id, job.key, job.status, job.created_at.timestamp(), data)
+            )
+
+    def load(self, job_id: str) -> Job | None:
+        with self._lock:
+            row = self._db.execute("SELECT data, key FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return Job.from_dict(json.loads(row[0]), row[1]) if row else None
+
+    def find_active(self, key: str) -> Job | None:
+        """The latest queued or running job for `key` that isn't presumed lost."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data FROM jobs WHERE key = ? AND status IN ('queued', 'running') AND created >= ? "
+                "ORDER BY created DESC LIMIT 1",
+                (key, time.time() - JOB_STALE_SECONDS)
+            ).fetchone()
+        return Job.from_dict(json.loads(row[0]), key) if row else None
+
+    def trim(self, limit: int):
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND job_id NOT IN ("
+                "SELECT job_id FROM jobs WHERE status IN ('succeeded', 'failed') ORDER BY created DESC LIMIT ?)",
+                (limit,)
+            )
+
+_table = _JobTable() if SHARED else None
+
+class JobQueue:
+    """
+    In-process FIFO of async jobs drained by a fixed number of worker tasks.
+    Workers are started lazily on the first `submit`, so the queue works with
+    or without the app lifespan; `stop()` cancels them on shutdown.
+
+    Jobs run in the process that submitted them. With the shared SQLite
+    store their state is also written there, so `get_job` and `active` see
+    the jobs of every worker; otherwise only this process's.
+    """
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self._queue: asyncio.Queue[Job] | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._active: dict[str, Job] = {}
+
+    def submit(self, kind: str, func: Callable[[], Awaitable[Any]], key: str | None = None) -> Job:
+        self._ensure_workers()
+        job = Job(kind, func, key)
+        self._jobs[job.id] = job
+        if key is not None:
+            self._active[key] = job
+        self._save(job)
+        self._trim_history()
+        self._queue.put_nowait(job)
+        return job
+
+    def record(self, kind: str, result: Any) -> Job:
+        """Registers a job that finished without running, e.g. one answered from a cache."""
+        job = Job(kind, None)
+        job.status = "succeeded"
+        job.result = result
+        job.started_at = job.finished_at = job.created_at
+        job.done.set()
+        self._jobs[job.id] = job
+        self._save(job)
+        self._trim_history()
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def active(self, key: str) -> Job | None:
+        """The queued or running job submitted with `key`, on this or (shared store) any worker."""
+        job = self._active.get(key)
+        if job is None and _table is not None:
+            job = _table.find_active(key)
+        return job
+
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def _ensure_workers(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"{self.name}-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    def _save(self, job: Job):
+        if _table is None:
+            return
+        try:
+            _table.save(job)
+        except Exception as e:
+            logger.error(f"[JobError][{self.name}][job={job.id}]: failed to save job state: {e}")
+
+    def _trim_history(self):
+        # Forget the oldest finished jobs; queued/running ones are never dropped.
+        overflow = len(self._jobs) - JOB_HISTORY_LIMIT
+        for job_id in list(self._jobs):
+            if overflow <= 0:
+                break
+            if self._jobs[job_id].done.is_set():
+                del self._jobs[job_id]
+                overflow -= 1
+        if _table is not None:
+            _table.trim(JOB_HISTORY_LIMIT)
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            self._save(job)
+            try:
+                job.result = await job.func()
+                job.status = "succeeded"
+            except Exception as e:
+                traceback.print_exc()
+                logger.error(f"[JobError][{self.name}][job={job.id}][{job.kind}]: {e}")
+                job.status = "failed"
+                job.error = str(e)
+            finally:
+                job.finished_at = datetime.utcnow()
+                job.func = None
+                if job.key is not None and self._active.get(job.key) is job:
+                    del self._active[job.key]
+                self._save(job)
+                job.done.set()
+                self._queue.task_done()
+
+_queues: list[JobQueue] = []
+
+def create_queue(name: str, workers: int) -> JobQueue:
+    queue = JobQueue(name, workers)
+    _queues.append(queue)
+    return queue
+
+def get_job(job_id: str) -> Job | None:
+    for queue in _queues:
+        job = queue.get(job_id)
+        if job is not None:
+            return job
+    return _table.load(job_id) if _table is not None else None
+
+async def wait_for_job(job: Job, timeout: float | None = None) -> Job:
+    """
+    Waits up to `timeout` seconds for `job` to finish and returns its latest
+    state. Jobs of this process are awaited directly; those run by another
+    worker are re-read from the shared store every JOB_POLL_SECONDS.
+    """
+    if not job.remote:
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job
+
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    while not job.done.is_set():
+        remaining = None if deadline is None else deadline - loop.time()
+        if remaining is not None and remaining <= 0:
+            break
+        await asyncio.sleep(JOB_POLL_SECONDS if remaining is None else min(JOB_POLL_SECONDS, remaining))
+        job = _table.load(job.id) or job
+    return job
+
+async def stop_all():
+    for queue in _queues:
+        await queue.stop()
+
+ingestion_queue = create_queue("ingestion", INGESTION_WORKERS)
+evaluation_queue = create_queue("evaluation", EVALUATION_WORKERS)
+openings_queue = create_queue("openings", OPENING_WARMUP_WORKERS)
@@ -0,0 +1,355 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator
+
+import google.api_core.exceptions as google_exceptions
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from pydantic import ConfigDict
+from starlette.concurrency import run_in_threadpool
+
+from app.config.settings import DEBUG
+from app.utils.metrics import Histogram
+
+# ─── Priority Lanes ──────────────────────────────────────────────────────
+# Calls wait for a free slot in lane order, so a candidate waiting for the
+# next question is served before summaries, evaluations and ingestion. The
+# lane follows the task: code that runs on behalf of a lower-priority job
+# wraps itself (or the task it spawns) in `llm_lane(...)`.
+
+LANES = ("interactive", "background", "evaluation", "ingestion")  # highest priority first
+
+_lane: ContextVar[str] = ContextVar("llm_lane", default="interactive")
+
+@contextmanager
+def llm_lane(name: str) -> Iterator[None]:
+    if name not in LANES:
+        raise ValueError(f"Unknown LLM lane: {name}")
+    token = _lane.set(name)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+class LLMUnavailableError(RuntimeError):
+    """
+    The provider is rate limiting us (429) or failing (503) and retries are
+    exhausted, or the call waited too long for a slot. Routers let it
+    through so clients see the real status and `Retry-After`.
+    """
+    def __init__(self, status_code: int, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """
+    Token bucket that lets callers reserve ahead: taking more than is left
+    puts the bucket in debt, and the caller sleeps until it is paid back.
+    A rate of None (or 0) disables the limit.
+    """
+    def __init__(self, rate: float | None, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float) -> float:
+        """Takes `amount` and returns how many seconds to wait before using it."""
+        if not self.rate:
+            return 0.0
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        self.level -= min(amount, self.capacity)  # a huge prompt shouldn't block forever
+        return max(0.0, -self.level / self.rate)
+
+_RETRYABLE = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+)
+_RATE_LIMITED = (google_exceptions.TooManyRequests, google_exceptions.ResourceExhausted)
+
+def _causes(e: BaseException) -> Iterator[BaseException]:
+    seen = set()
+    while e is not None and id(e) not in seen:
+        seen.add(id(e))
+        yield e
+        e = e.__cause__ or e.__context__
+
+def is_rate_limited(e: BaseException) -> bool:
+    return any(
+        isinstance(c, _RATE_LIMITED) or "429" in str(c) or "RESOURCE_EXHAUSTED" in str(c)
+        for c in _causes(e)
+    )
+
+def is_retryable(e: BaseException) -> bool:
+    """Rate limits, overload and timeouts; the provider wraps some of them, so causes are checked too."""
+    return is_rate_limited(e) or any(
+        isinstance(c, _RETRYABLE) or "503" in str(c) or "UNAVAILABLE" in str(c)
+        for c in _causes(e)
+    )
+
+# ─── Gateway ─────────────────────────────────────────────────────────────
+
+class LLMGateway:
+    """
+    Shared front door for provider calls: at most `max_concurrency` in
+    flight, requests-per-second and tokens-per-minute buckets, waiters
+    admitted in lane order, and retryable failures retried with full-jitter
+    exponential backoff (the slot is given back while sleeping).
+    """
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        requests_per_second: float | None,
+        tokens_per_minute: float | None,
+        max_retries: int,
+        retry_base: float,
+        retry_max: float,
+        queue_timeout: float
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.queue_timeout = queue_timeout
+        self._requests = TokenBucket(requests_per_second, max(1.0, requests_per_second or 0))
+        self._tokens = TokenBucket(tokens_per_minute and tokens_per_minute / 60, tokens_per_minute or 0)
+        self._active = 0
+        self._waiters: list[tuple[int, int, str, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+        self.wait_ms = Histogram((1, 5, 10, 50, 100, 500, 1000, 5000, 10000))
+
+    async def _acquire(self, lane: str, tokens: float):
+        queued_at = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (LANES.index(lane), next(self._seq), lane, future))
+        self._dispatch()
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                self._release()  # the slot arrived just as we gave up
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected += 1
+                raise LLMUnavailableError(
+                    503, "The interviewer is busy right now, please try again shortly.", self.queue_timeout
+                ) from None
+            raise
+
+        try:
+            delay = max(self._requests.reserve(1), self._tokens.reserve(tokens))
+            if delay:
+                await asyncio.sleep(delay)
+        except BaseException:
+            self._release()
+            raise
+        self.wait_ms.observe((time.perf_counter() - queued_at) * 1000)
+
+    def _release(self):
+        self._active -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        while self._waiters and self._active < self.max_concurrency:
+            *_, future = heapq.heappop(self._waiters)
+            if not future.done():  # skip callers that timed out or went away
+                self._active += 1
+                future.set_result(None)
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.retry_max, self.retry_base * 2 ** attempt))
+
+    def _unavailable(self, e: Exception, attempt: int) -> LLMUnavailableError:
+        self.failures += 1
+        if DEBUG:
+            print(f"⛔ {self.name} gave up after {attempt + 1} attempts: {e}")
+        if is_rate_limited(e):
+            return LLMUnavailableError(429, "The model is rate limited, please try again shortly.", self.retry_max)
+        return LLMUnavailableError(503, "The model is temporarily unavailable, please try again shortly.", self.retry_max)
+
+    async def _retry_or_raise(self, e: Exception, attempt: int):
+        if not is_retryable(e):
+            raise e
+        if attempt >= self.max_retries:
+            raise self._unavailable(e, attempt) from e
+        self.retries += 1
+        delay = self._backoff(attempt)
+        if DEBUG:
+            print(f"🔁 {self.name} call failed ({type(e).__name__}), retry {attempt + 1} in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+    async def call(self, func: Callable[[], Awaitable[Any]], tokens: float = 0) -> Any:
+        """Runs `func()` in the current lane, retrying retryable failures."""
+        lane = _lane.get()
+        for attempt in itertools.count():
+            await self._acquire(lane, tokens)
+            self.calls += 1
+            try:
+                return await func()
+            except Exception as e:
+                error = e
+            finally:
+                self._release()
+            await self._retry_or_raise(error, attempt)
+
+    async def stream(self, func: Callable[[], AsyncIterator[Any]], tokens: float = 0) -> AsyncIterator[Any]:
+        """
+        Like `call` for streams. Only failures before the first chunk are
+        retried; after that the client has seen part of the reply.
+        """
+        lane = _lane.get()
+        for attempt in itertools.count():
+            await self._acquire(lane, tokens)
+            self.calls += 1
+            started = False
+            try:
+                async for chunk in func():
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                if started:
+                    raise
+                error = e
+            finally:
+                self._release()
+            await self._retry_or_raise(error, attempt)
+
+    def stats(self) -> dict:
+        waiting = dict.fromkeys(LANES, 0)
+        for _, _, lane, future in self._waiters:
+            if not future.done():
+                waiting[lane] += 1
+        return {
+            "active": self._active,
+            "max_concurrency": self.max_concurrency,
+            "waiting": waiting,
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "wait_ms": self.wait_ms.to_dict(),
+        }
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1  # ~4 characters per token for English
+
+# ─── Gated Models ────────────────────────────────────────────────────────
+
+class GatewayChatModel(BaseChatModel):
+    """
+    Chat model whose async calls go through `gateway`. Chains are built on
+    it exactly as on the wrapped model; sync calls are passed straight through.
+    """
+    model: BaseChatModel
+    gateway: Any
+    output_tokens: int = 512  # charged up front since the reply length isn't known yet
+    call_kwargs: dict = {}  # passed to every provider call, e.g. to turn off the client's own retries
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    @property
+    def _llm_type(self) -> str:
+        return "gateway"
+
+    def _tokens(self, messages: list[BaseMessage]) -> int:
+        return sum(estimate_tokens(str(m.content)) for m in messages) + self.output_tokens
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        return self.model._generate(messages, stop=stop, **self.call_kwargs, **kwargs)
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        return self.model._stream(messages, stop=stop, **self.call_kwargs, **kwargs)
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        return await self.gateway.call(
+            lambda: self.model._agenerate(messages, stop=stop, **self.call_kwargs, **kwargs), self._tokens(messages)
+        )
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        chunks = self.gateway.stream(
+            lambda: self.model._astream(messages, stop=stop, **self.call_kwargs, **kwargs), self._tokens(messages)
+        )
+        async for chunk in chunks:
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+class GatewayEmbeddings(Embeddings):
+    """
+    Embeddings whose async calls go through `gateway`; sync calls are passed
+    straight through. `embed_queries` embeds a batch of queries in one sync
+    call, for providers that support it (see `aembed_queries`).
+    """
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        gateway: LLMGateway,
+        embed_queries: Callable[[list[str]], list[list[float]]] | None = None
+    ):
+        self.embeddings = embeddings
+        self.gateway = gateway
+        self._embed_queries = embed_queries
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embeddings.embed_query(text)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        tokens = sum(estimate_tokens(text) for text in texts)
+        return await self.gateway.call(lambda: self.embeddings.aembed_documents(texts), tokens)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return await self.gateway.call(lambda: self.embeddings.aembed_query(text), estimate_tokens(text))
+
+    async def aembed_queries(self, texts: list[str]) -> list[list[float]]:
+        if self._embed_queries is None:
+            return list(await asyncio.gather(*(self.aembed_query(text) for text in texts)))
+        tokens = sum(estimate_tokens(text) for text in texts)
+        return await self.gateway.call(lambda: run_in_threadpool(self._embed_queries, texts), tokens)
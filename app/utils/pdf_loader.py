@@ -1,13 +1,92 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import forkserver
+
 import fitz  # PyMuPDF
 from langchain.docstore.document import Document
+from app.utils import pdf_worker
+from app.config.settings import MAX_PDF_BYTES, MAX_PDF_PAGES, PDF_PARALLEL_MIN_PAGES, PDF_WORKERS
 
-def load_pdf(file_path: str) -> list[Document]:
+class PdfLimitError(ValueError):
+    """Raised when an upload exceeds the configured size or page limits."""
+
+_pool: ProcessPoolExecutor | None = None
+
+# Not fork: the parent runs threads (uvicorn, thread pool). Where it's
+# available, workers are forked from a fork server that has imported nothing
+# but the worker module, so each starts in milliseconds and never re-imports
+# the app; otherwise they are spawned.
+_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Processes are started on demand, up to PDF_WORKERS, by the first
+        # documents large enough to need them.
+        context = multiprocessing.get_context(_START_METHOD)
+        if _START_METHOD == "forkserver":
+            context.set_forkserver_preload([pdf_worker.__name__])
+        _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=context)
+    return _pool
+
+def warm_pool():
+    """
+    Starts the fork server ahead of the first large upload, so that upload
+    doesn't wait for PyMuPDF to be imported. No extraction process is
+    started until one is needed.
     """
-    Extracts text from a PDF file and returns a list containing a single LangChain Document.
+    _get_pool()
+    if _START_METHOD == "forkserver":
+        forkserver.ensure_running()
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+def load_pdf_bytes(data: bytes) -> list[Document]:
     """
+    Extracts text from an in-memory PDF and returns one LangChain Document per
+    page, with `page` (1-based) and `total_pages` metadata. Large documents are
+    extracted in parallel across a process pool.
+    """
+    if len(data) > MAX_PDF_BYTES:
+        raise PdfLimitError(f"PDF is larger than {MAX_PDF_BYTES // (1024 * 1024)} MB.")
+
     try:
-        doc = fitz.open(file_path)
-        full_text = "\n".join(page.get_text() for page in doc)
-        return [Document(page_content=full_text)]
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            page_count = doc.page_count
+            if page_count > MAX_PDF_PAGES:
+                raise PdfLimitError(f"PDF has {page_count} pages; the limit is {MAX_PDF_PAGES}.")
+            if page_count < PDF_PARALLEL_MIN_PAGES:
+                pages = [page.get_text() for page in doc]
+            else:
+                pages = None
+    except PdfLimitError:
+        raise
     except Exception as e:
         raise RuntimeError(f"Failed to load PDF: {str(e)}")
+
+    if pages is None:
+        step = -(-page_count // PDF_WORKERS)
+        futures = [
+            _get_pool().submit(pdf_worker.extract_pages, data, start, min(start + step, page_count))
+            for start in range(0, page_count, step)
+        ]
+        try:
+            pages = [text for future in futures for text in future.result()]
+        except Exception as e:
+            raise RuntimeError(f"Failed to load PDF: {str(e)}")
+
+    return [
+        Document(page_content=text, metadata={"page": i + 1, "total_pages": page_count})
+        for i, text in enumerate(pages)
+    ]
+
+def load_pdf(file_path: str) -> list[Document]:
+    """
+    Extracts text from a PDF file on disk. See `load_pdf_bytes`.
+    """
+    with open(file_path, "rb") as f:
+        return load_pdf_bytes(f.read())
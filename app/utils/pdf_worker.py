@@ -0,0 +1,8 @@
+# Runs in the PDF extraction processes (see pdf_loader). Kept free of app
+# imports, so a worker only ever loads PyMuPDF, not the settings, LangChain
+# or the server it was started from.
+import fitz  # PyMuPDF
+
+def extract_pages(data: bytes, start: int, stop: int) -> list[str]:
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        return [doc[i].get_text() for i in range(start, stop)]
@@ -0,0 +1,82 @@
+from qdrant_client.models import (
+    VectorParams, VectorParamsDiff, Distance, HnswConfigDiff, SearchParams, QuantizationSearchParams,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType, BinaryQuantization, BinaryQuantizationConfig,
+    CollectionConfig, Disabled
+)
+
+from app.config.settings import (
+    VECTOR_DIM,
+    QDRANT_QUANTIZATION,
+    QDRANT_QUANTIZATION_ALWAYS_RAM,
+    QDRANT_RESCORE,
+    QDRANT_OVERSAMPLING,
+    QDRANT_VECTORS_ON_DISK,
+    QDRANT_HNSW_M,
+    QDRANT_HNSW_EF_CONSTRUCT,
+    QDRANT_HNSW_PAYLOAD_M,
+    QDRANT_HNSW_EF
+)
+
+# Storage and search settings of the resume collection. An existing
+# collection is brought in line with them at startup (`config_updates`);
+# `benchmarks/vector_quantization.py` builds its collections with the same
+# functions.
+
+def collection_config(
+    quantization: str | None = QDRANT_QUANTIZATION,
+    vectors_on_disk: bool = QDRANT_VECTORS_ON_DISK,
+    hnsw_m: int | None = QDRANT_HNSW_M,
+    hnsw_ef_construct: int | None = QDRANT_HNSW_EF_CONSTRUCT,
+    hnsw_payload_m: int | None = QDRANT_HNSW_PAYLOAD_M,
+) -> dict:
+    """Keyword arguments for `create_collection`."""
+    if quantization == "scalar":
+        quantization_config = ScalarQuantization(scalar=ScalarQuantizationConfig(
+            type=ScalarType.INT8, quantile=0.99, always_ram=QDRANT_QUANTIZATION_ALWAYS_RAM
+        ))
+    elif quantization == "binary":
+        quantization_config = BinaryQuantization(binary=BinaryQuantizationConfig(
+            always_ram=QDRANT_QUANTIZATION_ALWAYS_RAM
+        ))
+    elif quantization is None:
+        quantization_config = None
+    else:
+        raise ValueError(f"Unknown quantization: {quantization!r}")
+
+    return {
+        "vectors_config": VectorParams(size=VECTOR_DIM, distance=Distance.COSINE, on_disk=vectors_on_disk),
+        "hnsw_config": HnswConfigDiff(m=hnsw_m, ef_construct=hnsw_ef_construct, payload_m=hnsw_payload_m),
+        "quantization_config": quantization_config,
+    }
+
+def config_updates(config: CollectionConfig) -> dict:
+    """
+    Keyword arguments for `update_collection` that bring an existing
+    collection's `config` in line with `collection_config()`; empty when
+    it already matches. Only the storage and index settings are compared.
+    """
+    wanted = collection_config()
+    updates = {}
+
+    hnsw = wanted["hnsw_config"].model_dump(exclude_none=True)
+    if any(getattr(config.hnsw_config, field) != value for field, value in hnsw.items()):
+        updates["hnsw_config"] = wanted["hnsw_config"]
+
+    if config.quantization_config != wanted["quantization_config"]:
+        updates["quantization_config"] = wanted["quantization_config"] or Disabled.DISABLED
+
+    vectors = config.params.vectors
+    on_disk = wanted["vectors_config"].on_disk
+    if isinstance(vectors, VectorParams) and bool(vectors.on_disk) != on_disk:
+        updates["vectors_config"] = {"": VectorParamsDiff(on_disk=on_disk)}
+    return updates
+
+def search_params(quantized: bool = QDRANT_QUANTIZATION is not None) -> SearchParams | None:
+    if not quantized and QDRANT_HNSW_EF is None:
+        return None
+    return SearchParams(
+        hnsw_ef=QDRANT_HNSW_EF,
+        quantization=QuantizationSearchParams(
+            rescore=QDRANT_RESCORE, oversampling=QDRANT_OVERSAMPLING
+        ) if quantized else None
+    )
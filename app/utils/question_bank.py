@@ -0,0 +1,117 @@
+import gzip
+import hashlib
+import json
+import os
+from collections import Counter
+from pathlib import Path
+from typing import NamedTuple
+
+class BankQuestion(NamedTuple):
+    text: str
+    topic: int  # index into `QuestionBank.topics`
+    level: int  # index into `QuestionBank.levels`
+
+def normalize_role(role_name: str) -> str:
+    return " ".join(role_name.split()).casefold()
+
+def bank_path(directory: Path, role_name: str) -> Path:
+    """Where the bank for `role_name` lives: one file per normalized role name."""
+    digest = hashlib.sha256(normalize_role(role_name).encode("utf-8")).hexdigest()[:16]
+    return Path(directory) / f"{digest}.json.gz"
+
+class QuestionBank:
+    """
+    Pre-generated interview questions for one role, tagged by topic and
+    difficulty level. Stored as gzipped JSON with topics and levels written
+    once and referenced by index, which keeps a few hundred questions to a
+    few KB. `version` changes whenever the bank is rebuilt, so sessions can
+    tell that their asked-question indexes no longer apply.
+    """
+    def __init__(
+        self,
+        role_name: str,
+        topics: list[str],
+        levels: list[str],
+        questions: list[BankQuestion],
+        prompt_version: str,
+        model: str,
+        version: str | None = None
+    ):
+        self.role_name = role_name
+        self.topics = topics
+        self.levels = levels
+        self.questions = questions
+        self.prompt_version = prompt_version
+        self.model = model
+        self.version = version or hashlib.sha256(
+            json.dumps([role_name, questions, prompt_version, model]).encode("utf-8")
+        ).hexdigest()[:12]
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def pick(self, asked: list[int], turn: int, turns_per_level: int, seed: int = 0) -> int | None:
+        """
+        Index of the next question to ask, or None once all have been asked.
+        Topics are covered breadth-first (never the same topic twice in a
+        row if another is left), difficulty rises with the turn number, and
+        `seed` rotates the topic order so sessions don't all run the same
+        sequence.
+        """
+        done = set(asked)
+        remaining = [i for i in range(len(self.questions)) if i not in done]
+        if not remaining:
+            return None
+
+        target_level = min(turn // max(1, turns_per_level), len(self.levels) - 1)
+        covered = Counter(self.questions[i].topic for i in asked if i < len(self.questions))
+        last_topic = self.questions[asked[-1]].topic if asked and asked[-1] < len(self.questions) else None
+
+        def rank(i: int) -> tuple:
+            question = self.questions[i]
+            return (
+                covered[question.topic],
+                question.topic == last_topic,
+                abs(question.level - target_level),
+                (question.topic + seed) % len(self.topics),
+                i,
+            )
+
+        return min(remaining, key=rank)
+
+    def to_dict(self) -> dict:
+        return {
+            "role_name": self.role_name,
+            "version": self.version,
+            "prompt_version": self.prompt_version,
+            "model": self.model,
+            "topics": self.topics,
+            "levels": self.levels,
+            "questions": [list(question) for question in self.questions],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuestionBank":
+        return cls(
+            role_name=data["role_name"],
+            topics=data["topics"],
+            levels=data["levels"],
+            questions=[BankQuestion(*question) for question in data["questions"]],
+            prompt_version=data["prompt_version"],
+            model=data["model"],
+            version=data["version"]
+        )
+
+    def save(self, path: Path):
+        """Writes the bank atomically, so a serving process never reads half a file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "QuestionBank":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,20 @@
+import sqlite3
+from pathlib import Path
+
+from app.config.settings import SESSION_BACKEND, SESSION_DB_PATH
+
+# With SESSION_BACKEND = "sqlite", sessions, background jobs and the
+# evaluation cache all live in one SQLite file, so every worker process
+# sees the same state. With "memory" each process keeps its own.
+SHARED = SESSION_BACKEND == "sqlite"
+
+def connect(path: Path = SESSION_DB_PATH) -> sqlite3.Connection:
+    """
+    Autocommit connection to the shared SQLite file in WAL mode, usable from
+    any thread; callers serialize access with their own lock.
+    """
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(path, timeout=30.0, check_same_thread=False, isolation_level=None)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db
@@ -0,0 +1,55 @@
+import json
+from typing import AsyncIterator, Callable
+
+from fastapi.responses import StreamingResponse
+from app.utils.logger import logger
+from app.utils.llm_gateway import LLMUnavailableError
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # stop reverse proxies from buffering the stream
+}
+
+def format_sse(data: dict, event: str | None = None) -> str:
+    """
+    Formats one server-sent event frame with a JSON payload.
+    """
+    frame = f"event: {event}\n" if event else ""
+    return frame + f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def single_chunk(text: str) -> AsyncIterator[str]:
+    """A reply that is already complete (e.g. served from a cache), as a one-chunk token stream."""
+    yield text
+
+def sse_response(
+    tokens: AsyncIterator[str],
+    on_complete: Callable[[str], dict],
+    error_detail: str,
+    log_prefix: str = "[StreamError]",
+) -> StreamingResponse:
+    """
+    Streams `tokens` to the client as `token` events. Once the stream is
+    exhausted, `on_complete(reply)` is called with the full reply (this is
+    where callers persist the turn) and its result is sent as a `done` event.
+    If generation fails, an `error` event is sent and nothing is persisted.
+    """
+    async def event_stream():
+        parts: list[str] = []
+        try:
+            async for token in tokens:
+                if not token:
+                    continue
+                parts.append(token)
+                yield format_sse({"token": token}, event="token")
+            done = on_complete("".join(parts))
+        except Exception as e:
+            logger.error(f"{log_prefix}: {e}")
+            if isinstance(e, LLMUnavailableError):
+                yield format_sse({"detail": e.detail, "status": e.status_code, "retry_after": e.retry_after}, event="error")
+            else:
+                yield format_sse({"detail": error_detail}, event="error")
+            return
+
+        yield format_sse(done, event="done")
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
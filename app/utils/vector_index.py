@@ -0,0 +1,108 @@
+import threading
+from collections import OrderedDict
+from typing import Iterable
+
+import numpy as np
+
+class DocumentIndex:
+    """
+    In-process vectors of one document's chunks: a contiguous, L2-normalised
+    float32 matrix alongside the chunk texts and metadata. Cosine similarity
+    and MMR are plain matrix operations, so a search over a resume's handful
+    of chunks takes microseconds.
+    """
+    def __init__(self, texts: list[str], metadatas: list[dict], vectors):
+        matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.matrix = matrix / norms
+        self.texts = list(texts)
+        self.metadatas = list(metadatas)
+        self._positions = {md.get("chunk_id"): i for i, md in enumerate(self.metadatas)}
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes
+
+    def search(
+        self,
+        query_vector,
+        k: int,
+        fetch_k: int | None = None,
+        lambda_mult: float = 0.5,
+        mmr: bool = True,
+        exclude_chunk_ids: Iterable[str] = ()
+    ) -> list[int]:
+        """
+        Returns the positions of up to `k` chunks, most relevant first. With
+        `mmr`, they are picked from the `fetch_k` best matches by maximal
+        marginal relevance, as `langchain_core`'s implementation does.
+        """
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        scores = self.matrix @ query
+
+        excluded = [self._positions[cid] for cid in exclude_chunk_ids if cid in self._positions]
+        if excluded:
+            scores[excluded] = -np.inf
+        available = len(self) - len(excluded)
+
+        n = min(fetch_k if mmr and fetch_k else k, available)
+        if n <= 0 or k <= 0:
+            return []
+        candidates = np.argpartition(-scores, n - 1)[:n]
+        candidates = candidates[np.argsort(-scores[candidates])]
+        if not mmr:
+            return candidates[:k].tolist()
+
+        vectors = self.matrix[candidates]
+        relevance = scores[candidates]
+        selected = [0]
+        redundancy = vectors @ vectors[0]
+        while len(selected) < min(k, n):
+            marginal = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+            marginal[selected] = -np.inf
+            best = int(np.argmax(marginal))
+            selected.append(best)
+            redundancy = np.maximum(redundancy, vectors @ vectors[best])
+        return candidates[selected].tolist()
+
+class LocalIndexStore:
+    """
+    Per-process LRU of `DocumentIndex`es keyed by document ID, capped at
+    `max_documents`. Sessions uploading the same resume share one index.
+    """
+    def __init__(self, max_documents: int):
+        self.max_documents = max_documents
+        self._indexes: OrderedDict[str, DocumentIndex] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, document_id: str) -> DocumentIndex | None:
+        with self._lock:
+            index = self._indexes.get(document_id)
+            if index is not None:
+                self._indexes.move_to_end(document_id)
+            return index
+
+    def put(self, document_id: str, index: DocumentIndex):
+        with self._lock:
+            self._indexes[document_id] = index
+            self._indexes.move_to_end(document_id)
+            while len(self._indexes) > self.max_documents:
+                self._indexes.popitem(last=False)
+
+    def pop(self, document_id: str):
+        with self._lock:
+            self._indexes.pop(document_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "documents": len(self._indexes),
+                "max_documents": self.max_documents,
+                "chunks": sum(len(index) for index in self._indexes.values()),
+                "bytes": sum(index.nbytes for index in self._indexes.values()),
+            }
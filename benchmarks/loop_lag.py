@@ -0,0 +1,89 @@
+"""
+Event-loop lag benchmark for the resume RAG path.
+
+Runs against a live server. While N resume uploads and N interview turns are
+in flight, a probe hits the cheap `GET /` live check every few milliseconds.
+If any handler blocks the event loop (sync embeddings, Qdrant calls, PDF
+parsing), the probe latency jumps to the length of the blocking call and
+concurrent turns finish one after another instead of together.
+
+Usage:
+    python benchmarks/loop_lag.py --pdf path/to/resume.pdf --concurrency 8
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, samples: list[float], interval: float):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/")
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+
+async def upload(client: httpx.AsyncClient, pdf_bytes: bytes) -> tuple[str, float]:
+    start = time.perf_counter()
+    response = await client.post(
+        "/chat/resume-rag/upload",
+        files={"file": ("resume.pdf", pdf_bytes, "application/pdf")}
+    )
+    response.raise_for_status()
+    return response.json()["session_id"], time.perf_counter() - start
+
+async def turn(client: httpx.AsyncClient, session_id: str) -> float:
+    start = time.perf_counter()
+    response = await client.post(
+        "/chat/resume-rag/interview",
+        json={"session_id": session_id, "message": "Hi, I'm ready to begin."}
+    )
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+async def main(args):
+    pdf_bytes = open(args.pdf, "rb").read()
+    samples: list[float] = []
+    stop = asyncio.Event()
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=120.0) as client:
+        await client.get("/")
+        prober = asyncio.create_task(probe(client, stop, samples, args.interval / 1000))
+
+        wall = time.perf_counter()
+        uploads = await asyncio.gather(*(upload(client, pdf_bytes) for _ in range(args.concurrency)))
+        upload_wall = time.perf_counter() - wall
+
+        wall = time.perf_counter()
+        turns = await asyncio.gather(*(turn(client, sid) for sid, _ in uploads))
+        turn_wall = time.perf_counter() - wall
+
+        stop.set()
+        await prober
+
+    upload_times = [t for _, t in uploads]
+    print(f"uploads: n={len(upload_times)} mean={statistics.mean(upload_times):.2f}s wall={upload_wall:.2f}s")
+    print(f"turns:   n={len(turns)} mean={statistics.mean(turns):.2f}s wall={turn_wall:.2f}s")
+    # With a non-blocking loop, wall time stays close to the mean latency.
+    # If requests serialize, wall time approaches mean * concurrency.
+    print(f"turn serialization ratio (wall / mean): {turn_wall / statistics.mean(turns):.2f}")
+    print(
+        f"probe latency ms: n={len(samples)} p50={percentile(samples, 50):.1f} "
+        f"p99={percentile(samples, 99):.1f} max={max(samples, default=0):.1f}"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--pdf", required=True)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--interval", type=float, default=5.0, help="probe interval in ms")
+    asyncio.run(main(parser.parse_args()))
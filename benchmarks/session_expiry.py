@@ -0,0 +1,143 @@
+"""
+Session-expiry microbenchmark.
+
+Compares the per-request cost of the old `get_session`, which scanned every
+session for expired ones, with the TTL-aware session store, where a request
+only touches its own session and a background sweep removes the expired
+ones from the front of the access order.
+
+Runs in-process; no server or API keys needed.
+
+Usage:
+    python benchmarks/session_expiry.py --sizes 10000 100000 1000000
+    python benchmarks/session_expiry.py --backend sqlite --sizes 10000 100000
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.memory.store import InMemorySessionStore, SQLiteSessionStore
+
+TIMEOUT_MINUTES = 20
+
+class Session:
+    """Stand-in for a chat session; only what expiry looks at."""
+    def __init__(self, last_accessed: datetime):
+        self.last_accessed = last_accessed
+
+    def to_dict(self) -> dict:
+        return {"last_accessed": self.last_accessed.isoformat()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Session":
+        return cls(datetime.fromisoformat(data["last_accessed"]))
+
+def full_scan_get(sessions: dict, session_id: str) -> Session:
+    """The original request path: expire everything, then look up."""
+    now = datetime.utcnow()
+    expired_ids = [
+        sid for sid, session in sessions.items()
+        if now - session.last_accessed > timedelta(minutes=TIMEOUT_MINUTES)
+    ]
+    for sid in expired_ids:
+        del sessions[sid]
+    session = sessions[session_id]
+    session.last_accessed = now
+    return session
+
+def store_get(store, session_id: str) -> Session:
+    session = store.get(session_id)
+    session.last_accessed = datetime.utcnow()
+    store.put(session_id, session)
+    return session
+
+def timed(func, ids: list[str], calls: int) -> list[float]:
+    samples = []
+    for session_id in random.sample(ids, calls):
+        start = time.perf_counter()
+        func(session_id)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+def make_store(backend: str, size: int, ids: list[str]):
+    if backend == "memory":
+        store = InMemorySessionStore("bench", ttl=TIMEOUT_MINUTES * 60)
+        now = datetime.utcnow()
+        for session_id in ids:
+            store.put(session_id, Session(now))
+        return store
+
+    path = Path(tempfile.mkdtemp()) / "sessions.sqlite"
+    store = SQLiteSessionStore(path, "bench", Session.from_dict, ttl=TIMEOUT_MINUTES * 60)
+    blob = store._encode(Session(datetime.utcnow()))
+    now = time.time()
+    store._db.execute("BEGIN")
+    store._db.executemany(
+        "INSERT INTO sessions (namespace, session_id, data, updated_at) VALUES ('bench', ?, ?, ?)",
+        ((session_id, blob, now) for session_id in ids)
+    )
+    store._db.execute("COMMIT")
+    return store
+
+def age_oldest(store, backend: str, ids: list[str], fraction: float) -> int:
+    """Backdates the least recently used `fraction` of sessions past the TTL."""
+    count = int(len(ids) * fraction)
+    stale = time.time() - TIMEOUT_MINUTES * 60 - 1
+    if backend == "memory":
+        for session_id in list(store._sessions)[:count]:
+            _, session, size = store._sessions[session_id]
+            store._sessions[session_id] = (stale, session, size)
+    else:
+        store._db.executemany(
+            "UPDATE sessions SET updated_at = ? WHERE namespace = 'bench' AND session_id = ?",
+            ((stale, session_id) for session_id in ids[:count])
+        )
+    return count
+
+def describe(samples: list[float]) -> str:
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))]
+    return f"median {statistics.median(samples):10.1f} µs   p99 {p99:10.1f} µs"
+
+def main(args):
+    for size in args.sizes:
+        ids = [f"s{i}" for i in range(size)]
+        print(f"\n── {size:,} sessions ({args.backend}) ──")
+
+        if args.backend == "memory" and not args.skip_scan:
+            now = datetime.utcnow()
+            sessions = {session_id: Session(now) for session_id in ids}
+            scan_calls = max(3, min(args.calls, 2_000_000 // size))
+            samples = timed(lambda sid: full_scan_get(sessions, sid), ids, scan_calls)
+            print(f"  full-scan get_session  {describe(samples)}   ({scan_calls} calls)")
+            del sessions
+
+        store = make_store(args.backend, size, ids)
+        samples = timed(lambda sid: store_get(store, sid), ids, args.calls)
+        print(f"  TTL store get_session  {describe(samples)}   ({args.calls} calls)")
+
+        stale = age_oldest(store, args.backend, ids, args.expired)
+        start = time.perf_counter()
+        removed = store.expire()
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"  sweep ({stale:,} expired)    {elapsed:10.1f} ms, removed {len(removed):,}")
+
+        start = time.perf_counter()
+        store.expire()
+        print(f"  sweep (none expired)   {(time.perf_counter() - start) * 1e6:10.1f} µs")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--calls", type=int, default=2000, help="lookups timed per size")
+    parser.add_argument("--expired", type=float, default=0.01, help="fraction of sessions expired before the sweep")
+    parser.add_argument("--skip-scan", action="store_true", help="don't time the old full-scan path")
+    main(parser.parse_args())
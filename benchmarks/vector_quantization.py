@@ -0,0 +1,180 @@
+"""
+Vector quantization benchmark for the resume collection.
+
+Loads the same synthetic resumes (or real embeddings from an .npy file)
+into one Qdrant collection per configuration, built with the app's own
+`collection_config`, and reports for each:
+
+  * RAM per 10k resumes: an estimate from the configuration (original and
+    quantized vectors plus HNSW links; payloads excluded) and, when the
+    server exposes it, the measured growth of Qdrant's resident memory;
+  * recall@5 of filtered per-resume searches against exact search on the
+    unquantized baseline;
+  * median search latency.
+
+Needs a running Qdrant server (local mode ignores quantization). The
+benchmark collections are deleted afterwards.
+
+Usage:
+    python benchmarks/vector_quantization.py --resumes 10000
+    python benchmarks/vector_quantization.py --vectors embeddings.npy --configs baseline scalar binary
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    Filter, FieldCondition, MatchValue, PointStruct, SearchParams, CollectionStatus, KeywordIndexParams, KeywordIndexType
+)
+
+from app.utils.qdrant_config import collection_config, search_params
+from app.config.settings import (
+    VECTOR_DIM, CHUNK_SIZE, QDRANT_REMOTE_URL, QDRANT_HNSW_M, QDRANT_QUANTIZATION_ALWAYS_RAM
+)
+
+CONFIGS = {
+    "baseline": {"quantization": None, "vectors_on_disk": False},
+    "scalar": {"quantization": "scalar", "vectors_on_disk": False},
+    "scalar-on-disk": {"quantization": "scalar", "vectors_on_disk": True},
+    "binary": {"quantization": "binary", "vectors_on_disk": False},
+    "binary-on-disk": {"quantization": "binary", "vectors_on_disk": True},
+}
+
+def synthetic_vectors(resumes: int, chunks: int, seed: int) -> np.ndarray:
+    """Chunks of one resume scatter around a shared topic vector, like real ones."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(resumes, 1, VECTOR_DIM))
+    vectors = centers + rng.normal(scale=1.5, size=(resumes, chunks, VECTOR_DIM))
+    vectors = vectors.reshape(-1, VECTOR_DIM).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def estimate_bytes(quantization: str | None, vectors_on_disk: bool) -> int:
+    """RAM per vector implied by the configuration."""
+    original = 0 if vectors_on_disk else VECTOR_DIM * 4
+    quantized = {None: 0, "scalar": VECTOR_DIM, "binary": VECTOR_DIM // 8}[quantization]
+    if not QDRANT_QUANTIZATION_ALWAYS_RAM and vectors_on_disk:
+        quantized = 0
+    links = 2 * (QDRANT_HNSW_M or 16) * 4  # level-0 neighbours dominate the graph; Qdrant's default m is 16
+    return original + quantized + links
+
+async def resident_bytes(url: str) -> int | None:
+    try:
+        async with httpx.AsyncClient(base_url=url, timeout=10.0) as http:
+            text = (await http.get("/metrics")).text
+    except httpx.HTTPError:
+        return None
+    for line in text.splitlines():
+        if line.startswith("memory_resident_bytes "):
+            return int(float(line.split()[1]))
+    return None
+
+def document_filter(document_id: str) -> Filter:
+    return Filter(must=[FieldCondition(key="document_id", match=MatchValue(value=document_id))])
+
+async def load(client: AsyncQdrantClient, name: str, config: dict, vectors: np.ndarray, chunks: int, batch: int):
+    await client.create_collection(collection_name=name, **collection_config(**config))
+    await client.create_payload_index(
+        name, "document_id", KeywordIndexParams(type=KeywordIndexType.KEYWORD, is_tenant=True)
+    )
+    content = "x" * CHUNK_SIZE
+    for start in range(0, len(vectors), batch):
+        await client.upsert(
+            collection_name=name,
+            points=[
+                PointStruct(
+                    id=i,  # same IDs in every collection, so results are comparable
+                    vector=vectors[i].tolist(),
+                    payload={"page_content": content, "document_id": f"doc{i // chunks}"}
+                )
+                for i in range(start, min(start + batch, len(vectors)))
+            ]
+        )
+    while (await client.get_collection(name)).status != CollectionStatus.GREEN:
+        await asyncio.sleep(0.5)
+
+async def search(client, name: str, query: np.ndarray, document_id: str, params) -> tuple[list, float]:
+    start = time.perf_counter()
+    response = await client.query_points(
+        collection_name=name,
+        query=query.tolist(),
+        query_filter=document_filter(document_id),
+        search_params=params,
+        limit=5
+    )
+    return [point.id for point in response.points], (time.perf_counter() - start) * 1000
+
+async def main(args):
+    if args.vectors:
+        vectors = np.load(args.vectors).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors[:len(vectors) // args.chunks * args.chunks]
+    else:
+        vectors = synthetic_vectors(args.resumes, args.chunks, args.seed)
+    resumes = len(vectors) // args.chunks
+    print(f"{resumes:,} resumes × {args.chunks} chunks = {len(vectors):,} vectors of {VECTOR_DIM} dims")
+
+    rng = np.random.default_rng(args.seed + 1)
+    picks = rng.integers(0, len(vectors), size=args.queries)
+    queries = vectors[picks] + rng.normal(scale=0.02, size=(args.queries, VECTOR_DIM)).astype(np.float32)
+    documents = [f"doc{i // args.chunks}" for i in picks]
+
+    client = AsyncQdrantClient(url=args.url, timeout=120.0)
+    names = {config: f"bench_quantization_{config.replace('-', '_')}" for config in ["baseline", *args.configs]}
+    truth = None
+    try:
+        for config, name in names.items():
+            await client.delete_collection(name)
+            before = await resident_bytes(args.url)
+            await load(client, name, CONFIGS[config], vectors, args.chunks, args.batch)
+            after = await resident_bytes(args.url)
+
+            if truth is None:
+                # Ground truth: exact (brute-force) search on the unquantized baseline.
+                truth = [
+                    set((await search(client, name, q, d, SearchParams(exact=True)))[0])
+                    for q, d in zip(queries, documents)
+                ]
+                if config not in args.configs:
+                    continue
+
+            params = search_params(CONFIGS[config]["quantization"] is not None)
+            recalls, latencies = [], []
+            for q, d, expected in zip(queries, documents, truth):
+                found, elapsed = await search(client, name, q, d, params)
+                recalls.append(len(expected & set(found)) / max(1, len(expected)))
+                latencies.append(elapsed)
+
+            per_10k = 10_000 / resumes
+            estimate = estimate_bytes(**CONFIGS[config]) * len(vectors) * per_10k / 2**20
+            measured = f"{(after - before) * per_10k / 2**20:8.1f} MiB" if before and after else "     n/a"
+            print(
+                f"  {config:<15} est. {estimate:8.1f} MiB   measured {measured}   "
+                f"recall@5 {statistics.mean(recalls):.3f}   p50 {statistics.median(latencies):6.2f} ms"
+            )
+    finally:
+        if not args.keep:
+            for name in names.values():
+                await client.delete_collection(name)
+        await client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=QDRANT_REMOTE_URL)
+    parser.add_argument("--resumes", type=int, default=10_000)
+    parser.add_argument("--chunks", type=int, default=12, help="chunks per resume")
+    parser.add_argument("--vectors", type=Path, help=".npy matrix of real chunk embeddings to use instead of synthetic ones")
+    parser.add_argument("--configs", nargs="+", choices=list(CONFIGS), default=list(CONFIGS))
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=512, help="points per upsert")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="don't delete the benchmark collections")
+    asyncio.run(main(parser.parse_args()))
@@ -4,7 +4,9 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import (
     status,
@@ -12,7 +14,25 @@ from app.routers import (
     jd,
     resume,
     hybrid,
+    jobs,
+    evaluations,
+    admin,
 )
+from app.memory.store import start_sweeper, stop_sweeper
+from app.chains.rag import bootstrap_collection
+from app.utils.jobs import stop_all as stop_job_queues
+from app.utils.llm_gateway import LLMUnavailableError
+from app.utils.pdf_loader import warm_pool as warm_pdf_pool, shutdown_pool as shutdown_pdf_pool
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_pdf_pool()
+    await bootstrap_collection()
+    start_sweeper()
+    yield
+    await stop_sweeper()
+    await stop_job_queues()
+    shutdown_pdf_pool()
 
 app = FastAPI(
     title="AI Interviewer",
@@ -22,7 +42,8 @@ app = FastAPI(
         "Powered by FastAPI, LangChain, and LLMs to generate targeted questions "
         "and follow-ups based on your background and the hiring criteria."
     ),
-    version="0.0.1"
+    version="0.0.1",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -33,12 +54,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(LLMUnavailableError)
+async def llm_unavailable(request: Request, exc: LLMUnavailableError):
+    # Provider overload is the client's cue to back off, not a server bug.
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))}
+    )
+
 # Include the routers correctly
 app.include_router(status.router)
 app.include_router(role_based.router)
 app.include_router(jd.router)
 app.include_router(resume.router)
 app.include_router(hybrid.router)
+app.include_router(jobs.router)
+app.include_router(evaluations.router)
+app.include_router(admin.router)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,93 @@
+"""
+Offline question-bank builder for role-based interviews.
+
+Generates a bank of interview questions per role with the live role prompt
+(app/prompts/role_prompt.txt), tagged by topic and difficulty level, and
+writes it to QUESTION_BANK_DIR as one small gzipped file per role. With
+ROLE_QUESTION_SOURCE = "bank", `/chat/role/interview` then asks from the
+bank and only calls the LLM for follow-ups. Banks are picked up by running
+servers without a restart; rebuild them after changing the role prompt.
+
+Usage:
+    python scripts/question_bank.py build "Backend Engineer" "Data Scientist"
+    python scripts/question_bank.py build --roles-file top_roles.txt --per-level 3
+    python scripts/question_bank.py build "SRE" --topics "Incident response" "Observability" "Capacity planning"
+    python scripts/question_bank.py show "Backend Engineer"
+    python scripts/question_bank.py list
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+load_dotenv()
+
+from app.utils.question_bank import QuestionBank, bank_path
+from app.config.settings import QUESTION_BANK_DIR, QUESTION_BANK_TOPICS, QUESTION_BANK_PER_LEVEL
+
+async def build(args):
+    from app.chains.question_bank import build_bank, generate_topics  # needs GEMINI_API_KEY
+
+    roles = list(args.roles)
+    if args.roles_file:
+        roles += [line.strip() for line in args.roles_file.read_text().splitlines() if line.strip()]
+    if not roles:
+        sys.exit("No roles given.")
+
+    for role_name in roles:
+        path = bank_path(args.dir, role_name)
+        if path.exists() and not args.force:
+            print(f"⏭ {role_name}: bank exists ({path}), use --force to rebuild")
+            continue
+        start = time.perf_counter()
+        topics = args.topics or await generate_topics(role_name, args.topic_count)
+        bank = await build_bank(role_name, topics, args.per_level)
+        bank.save(path)
+        print(
+            f"📚 {role_name}: {len(bank)} questions on {len(topics)} topics "
+            f"in {time.perf_counter() - start:.1f}s → {path} ({path.stat().st_size / 1024:.1f} KiB)"
+        )
+
+def show(args):
+    path = bank_path(args.dir, args.role)
+    if not path.exists():
+        sys.exit(f"No bank for '{args.role}' in {args.dir}.")
+    bank = QuestionBank.load(path)
+    print(f"{bank.role_name} — version {bank.version}, model {bank.model}, {len(bank)} questions")
+    for i, question in enumerate(bank.questions):
+        print(f"[{i}] ({bank.topics[question.topic]} / {bank.levels[question.level]}) {question.text}")
+
+def list_banks(args):
+    for path in sorted(Path(args.dir).glob("*.json.gz")):
+        bank = QuestionBank.load(path)
+        print(f"{bank.role_name:<40} {len(bank):>4} questions  {len(bank.topics):>3} topics  {path.name}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", type=Path, default=QUESTION_BANK_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="generate banks for one or more roles")
+    build_parser.add_argument("roles", nargs="*")
+    build_parser.add_argument("--roles-file", type=Path, help="one role name per line")
+    build_parser.add_argument("--topics", nargs="+", help="topics to cover (default: generated per role)")
+    build_parser.add_argument("--topic-count", type=int, default=QUESTION_BANK_TOPICS)
+    build_parser.add_argument("--per-level", type=int, default=QUESTION_BANK_PER_LEVEL, help="questions per topic and level")
+    build_parser.add_argument("--force", action="store_true", help="rebuild existing banks")
+
+    show_parser = commands.add_parser("show", help="print the questions of a role's bank")
+    show_parser.add_argument("role")
+
+    commands.add_parser("list", help="list the banks in --dir")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        asyncio.run(build(args))
+    elif args.command == "show":
+        show(args)
+    else:
+        list_banks(args)